@@ -27,6 +27,7 @@ from api.schemas.panel import (
     SchemaFieldSummary,
     SourceInfo,
 )
+from services.thread_pools import shutdown_pools
 
 logger = logging.getLogger(__name__)
 
@@ -112,7 +113,7 @@ class MockChatService:
                 data_ref=data_block.id,
                 data={
                     "items": block_records,
-                    "schema": schema_summary.model_dump(),
+                    "schema": data_block.schema_dump(),
                     "stats": data_block.stats,
                 },
                 props={
@@ -236,7 +237,7 @@ class MockChatService:
             data_ref=data_block.id,
             data={
                 "items": block_records,
-                "schema": schema_summary.model_dump(),
+                "schema": data_block.schema_dump(),
                 "stats": data_block.stats,
             },
             props={
@@ -396,6 +397,9 @@ def shutdown_services():
             _chat_service = None
             _service_mode = "uninitialized"
 
+    # 各服务共用的进程级线程池在最后统一关闭
+    shutdown_pools()
+
 
 @router.post(
     "/chat",
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisco
 from pydantic import BaseModel, Field
 
 from api.controllers.chat_controller import get_chat_service
+from services.research_constants import StreamEventType
 from services.research_service import ResearchService
 
 logger = logging.getLogger(__name__)
@@ -114,7 +115,12 @@ async def research_stream(websocket: WebSocket):
     try:
         while True:
             event = await loop.run_in_executor(None, queue.get)
-            await websocket.send_json(event)
+            # 任务中心会把短时间内的多条事件合并投递，推送时按原顺序逐条发送
+            if event.get("type") == StreamEventType.BATCH:
+                for item in event["events"]:
+                    await websocket.send_json(item)
+            else:
+                await websocket.send_json(event)
     except WebSocketDisconnect:
         logger.info("研究任务 %s 的 WebSocket 断开", task_id)
     except Exception as exc:  # pragma: no cover
@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class SourceInfo(BaseModel):
@@ -55,6 +55,20 @@ class DataBlock(BaseModel):
         None, description="Reference to persisted full dataset"
     )
 
+    _schema_dump: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    def schema_dump(self) -> Dict[str, Any]:
+        """
+        schema_summary 的字典形式（首次调用时导出并缓存，schema_summary 视为不可变）。
+
+        返回的字典由本数据块派生的所有 UIBlock 的 data["schema"] 共享，调用方只能读取；
+        需要修改时请先 copy.deepcopy。不使用 MappingProxyType 包装，是因为 pydantic
+        无法序列化它。
+        """
+        if self._schema_dump is None:
+            self._schema_dump = self.schema_summary.model_dump()
+        return self._schema_dump
+
 
 class ComponentInteraction(BaseModel):
     """组件交互定义。"""
@@ -188,6 +188,20 @@ class CacheService:
 
             return value
 
+    def has_rag_cache(self, query: str, **kwargs) -> bool:
+        """
+        检查RAG检索结果是否已缓存（不计入命中率统计）
+
+        Args:
+            query: 用户查询
+            **kwargs: 额外的查询参数
+
+        Returns:
+            是否存在未过期的缓存
+        """
+        with self.rag_lock:
+            return self._generate_key("rag", query, **kwargs) in self.rag_cache
+
     def set_rag_cache(self, query: str, value: Any, **kwargs) -> None:
         """
         设置RAG检索结果缓存
@@ -3,6 +3,7 @@ from __future__ import annotations
 """对接现有 DataQueryService 的公共数据工具。"""
 
 import logging
+import threading
 from typing import Any, Dict, Optional
 
 from services.data_query_service import DataQueryResult
@@ -13,6 +14,11 @@ from .registry import ToolRegistry, tool
 
 logger = logging.getLogger(__name__)
 
+# ToolExecutionContext.extras 中查询结果缓存的键（由 ResearchService 注入 TTLCache），
+# 规划器/反思循环重复发起相同查询时直接复用，不再重走 RAG 流水线
+PUBLIC_DATA_CACHE_KEY = "public_data_cache"
+_cache_lock = threading.Lock()  # TTLCache 本身不是线程安全的
+
 
 def _format_success_payload(result: DataQueryResult) -> Dict[str, Any]:
     return {
@@ -58,6 +64,17 @@ def register_public_data_tool(registry: ToolRegistry) -> None:
             raise ValueError("fetch_public_data 需要 query 参数")
 
         filter_ds: Optional[str] = call.args.get("filter_datasource")
+        cache = context.extras.get(PUBLIC_DATA_CACHE_KEY)
+        cache_key = (query, filter_ds)
+        if cache is not None:
+            with _cache_lock:
+                cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("fetch_public_data 命中缓存: %s", query)
+                return ToolExecutionPayload(
+                    call=call, raw_output=dict(cached, cache_hit=True), status="success"
+                )
+
         logger.info("调用 DataQueryService: %s", query)
         result = dq.query(
             user_query=query,
@@ -67,6 +84,9 @@ def register_public_data_tool(registry: ToolRegistry) -> None:
 
         if result.status == "success":
             payload = _format_success_payload(result)
+            if cache is not None:
+                with _cache_lock:
+                    cache[cache_key] = payload
             return ToolExecutionPayload(call=call, raw_output=payload, status="success")
 
         error_msg = result.reasoning or "DataQueryService 返回非 success"
@@ -57,6 +57,7 @@ class RAGInAction:
         user_query: str,
         filter_datasource: Optional[str] = None,
         verbose: bool = True,
+        query_embedding: Optional[Any] = None,
     ) -> Dict[str, Any]:
         """
         处理用户查询
@@ -71,6 +72,7 @@ class RAGInAction:
             user_query: 用户的自然语言查询
             filter_datasource: 过滤特定数据源（可选）
             verbose: 是否打印详细日志
+            query_embedding: 预先批量计算的查询向量（可选，见 embed_queries）
 
         Returns:
             处理结果字典，包含：
@@ -99,6 +101,7 @@ class RAGInAction:
                 top_k=self.retrieval_top_k,
                 filter_datasource=filter_datasource,
                 verbose=verbose,
+                query_embedding=query_embedding,
             )
 
             if not rag_results:
@@ -288,6 +291,10 @@ class RAGInAction:
                 "retrieved_tools": [],
             }
 
+    def embed_queries(self, queries: List[str]) -> Any:
+        """批量计算查询向量，供多条查询并行处理前一次性编码（逐条传给 process）"""
+        return self.rag_pipeline.embed_queries(queries)
+
     @staticmethod
     def _enrich_retrieved_tool(route_id: str, score: float, route_def: Dict[str, Any]) -> Dict[str, Any]:
         """附加检索得分和路由模板，便于前端透明展示。"""
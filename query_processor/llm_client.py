@@ -2,9 +2,10 @@
 LLM客户端抽象层
 职责：使用成熟的LangChain聊天模型接口统一不同LLM提供商的调用方式
 """
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Optional
 
 from .config import llm_settings
 
@@ -12,6 +13,29 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _invoke_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """提取 LangChain invoke 支持的生成参数（值为 None 时跳过）。"""
+    invoke_kwargs = {}
+    temperature = kwargs.get("temperature")
+    max_tokens = kwargs.get("max_tokens")
+    if temperature is not None:
+        invoke_kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        invoke_kwargs["max_tokens"] = max_tokens
+    return invoke_kwargs
+
+
+def _response_text(response: Any) -> str:
+    """将 LangChain 消息内容（字符串或分片列表）统一转换为文本。"""
+    content = response.content
+    if isinstance(content, list):
+        content = "".join(
+            piece.get("text", "") if isinstance(piece, dict) else str(piece)
+            for piece in content
+        )
+    return str(content)
+
+
 class LLMClient(ABC):
     """LLM客户端抽象基类"""
 
@@ -29,6 +53,15 @@ class LLMClient(ABC):
         """
         raise NotImplementedError
 
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        异步生成文本
+
+        默认在线程池中执行同步 generate，避免阻塞事件循环；
+        支持原生异步调用的子类应覆盖此方法。
+        """
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
+
     def chat(self, messages, **kwargs) -> str:
         """聊天接口（子类可根据需要实现）。"""
         raise NotImplementedError("chat() 未在该 LLM 客户端实现")
@@ -81,30 +114,22 @@ class OpenAIClient(LLMClient):
 
     def generate(self, prompt: str, **kwargs) -> str:
         """调用OpenAI聊天模型"""
-        temperature = kwargs.get("temperature", None)
-        max_tokens = kwargs.get("max_tokens", None)
+        response = self.client.invoke(self._prompt_messages(prompt), **_invoke_kwargs(kwargs))
+        return _response_text(response)
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """异步调用OpenAI聊天模型（LangChain ainvoke，不占用线程）"""
+        response = await self.client.ainvoke(
+            self._prompt_messages(prompt), **_invoke_kwargs(kwargs)
+        )
+        return _response_text(response)
 
+    def _prompt_messages(self, prompt: str) -> list:
         messages = []
         if self.system_prompt:
             messages.append(self._SystemMessage(content=self.system_prompt))
         messages.append(self._HumanMessage(content=prompt))
-
-        invoke_kwargs = {}
-        if temperature is not None:
-            invoke_kwargs["temperature"] = temperature
-        if max_tokens is not None:
-            invoke_kwargs["max_tokens"] = max_tokens
-
-        response = self.client.invoke(messages, **invoke_kwargs)
-
-        content = response.content
-        if isinstance(content, list):
-            content = "".join(
-                piece.get("text", "") if isinstance(piece, dict) else str(piece)
-                for piece in content
-            )
-
-        return str(content)
+        return messages
 
     def chat(self, messages, **kwargs) -> str:
         lc_messages = []
@@ -202,30 +227,22 @@ class AnthropicClient(LLMClient):
 
     def generate(self, prompt: str, **kwargs) -> str:
         """调用Anthropic聊天模型"""
-        temperature = kwargs.get("temperature", None)
-        max_tokens = kwargs.get("max_tokens", None)
+        response = self.client.invoke(self._prompt_messages(prompt), **_invoke_kwargs(kwargs))
+        return _response_text(response)
 
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """异步调用Anthropic聊天模型（LangChain ainvoke，不占用线程）"""
+        response = await self.client.ainvoke(
+            self._prompt_messages(prompt), **_invoke_kwargs(kwargs)
+        )
+        return _response_text(response)
+
+    def _prompt_messages(self, prompt: str) -> list:
         messages = []
         if self.system_prompt:
             messages.append(self._SystemMessage(content=self.system_prompt))
         messages.append(self._HumanMessage(content=prompt))
-
-        invoke_kwargs = {}
-        if temperature is not None:
-            invoke_kwargs["temperature"] = temperature
-        if max_tokens is not None:
-            invoke_kwargs["max_tokens"] = max_tokens
-
-        response = self.client.invoke(messages, **invoke_kwargs)
-
-        content = response.content
-        if isinstance(content, list):
-            content = "".join(
-                piece.get("text", "") if isinstance(piece, dict) else str(piece)
-                for piece in content
-            )
-
-        return str(content)
+        return messages
 
     def chat(self, messages, **kwargs) -> str:
         lc_messages = []
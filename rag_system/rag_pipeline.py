@@ -5,6 +5,8 @@ RAG完整流程管道
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import logging
+
+import numpy as np
 from tqdm import tqdm
 
 try:
@@ -180,6 +182,7 @@ class RAGPipeline:
         top_k: Optional[int] = None,
         filter_datasource: Optional[str] = None,
         verbose: bool = True,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         搜索相关路由
@@ -189,6 +192,7 @@ class RAGPipeline:
             top_k: 返回结果数量（默认使用配置）
             filter_datasource: 过滤特定数据源
             verbose: 是否打印详细信息
+            query_embedding: 预先批量计算好的查询向量（可选，提供时跳过向量化）
 
         Returns:
             [(route_id, similarity_score, route_definition), ...]
@@ -200,8 +204,9 @@ class RAGPipeline:
             logger.debug(f"查询: {query}")
             logger.debug("-" * 80)
 
-        # 将查询向量化
-        query_embedding = self.embedding_model.encode_queries(query)[0]
+        # 将查询向量化（调用方已批量计算时直接复用）
+        if query_embedding is None:
+            query_embedding = self.embedding_model.encode_queries(query)[0]
 
         # 检索
         results = self.retriever.search(
@@ -224,6 +229,18 @@ class RAGPipeline:
 
         return results
 
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        批量计算查询向量（一次模型调用），结果可逐条传给 search(query_embedding=...)
+
+        Args:
+            queries: 查询文本列表
+
+        Returns:
+            向量数组 (n_queries, embedding_dim)
+        """
+        return self.embedding_model.encode_queries(queries)
+
     def get_route_by_id(self, route_id: str) -> Optional[Dict[str, Any]]:
         """
         根据route_id获取完整路由定义
@@ -14,7 +14,7 @@ from services.panel.component_planner import (
     PlannerContext,
     plan_components_for_route,
 )
-from services.panel.llm_component_planner import LLMComponentPlanner
+from services.panel.llm_component_planner import LLMComponentPlanner, SHORTCUT_REASON
 from services.panel.adapters import get_route_manifest
 
 
@@ -58,7 +58,8 @@ def main() -> None:
                 config=config,
             )
             if decision:
-                planner_engine = "llm"
+                is_shortcut = decision.reasons[:1] == [SHORTCUT_REASON]
+                planner_engine = "shortcut" if is_shortcut else "llm"
 
     if decision is None:
         decision = plan_components_for_route(
@@ -28,6 +28,8 @@ def merge_planner_engines(engines: List[str]) -> str:
         return "llm"
     if "error" in engines and "rule" in engines:
         return "mixed"
+    if "shortcut" in engines:
+        return "shortcut"
     return engines[0]
 
 
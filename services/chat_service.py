@@ -24,9 +24,10 @@ from services.panel.panel_generator import (
 from services.panel.component_planner import (
     ComponentPlannerConfig,
     PlannerContext,
+    PlannerDecision,
     plan_components_for_route,
 )
-from services.panel.llm_component_planner import LLMComponentPlanner
+from services.panel.llm_component_planner import LLMComponentPlanner, PlanRequest, SHORTCUT_REASON
 from services.panel.adapters import get_route_manifest
 from query_processor.llm_client import create_llm_client
 
@@ -104,7 +105,7 @@ class ChatService:
         research_service=None,  # 研究服务（可选，用于 LangGraph 工作流）
         manage_data_service: bool = False,
         component_planner_config: Optional[ComponentPlannerConfig] = None,
-        max_parallel_queries: int = 3,  # 并行查询最大数量
+        max_parallel_queries: Optional[int] = None,  # 并行查询最大数量（None 使用执行器默认值）
         query_timeout: int = 30,  # 单个查询超时时间（秒）
         force_single_route: Optional[bool] = None,
     ):
@@ -117,7 +118,8 @@ class ChatService:
             research_service: 研究服务实例（可选，用于 LangGraph 复杂研究工作流）
             manage_data_service: 是否由 ChatService 负责关闭 data_query_service
             component_planner_config: 组件规划器配置（可选）
-            max_parallel_queries: 并行查询的最大工作线程数（默认 3）
+            max_parallel_queries: 并行查询的最大工作线程数（默认按 CPU 核数推算，
+                可通过 OMNIBOX_PARALLEL_WORKERS 环境变量覆盖）
             query_timeout: 每个查询的超时时间，秒（默认 30）
         """
         self.data_query_service = data_query_service
@@ -165,7 +167,7 @@ class ChatService:
                 )
                 logger.info(
                     "并行查询执行器初始化完成 (max_workers=%d, timeout=%ds)",
-                    max_parallel_queries,
+                    self.parallel_executor.max_workers,
                     query_timeout,
                 )
             except Exception as exc:
@@ -1134,21 +1136,30 @@ class ChatService:
         planner_reasons_acc: List[str] = []
         planner_engines: List[str] = []
 
-        for index, dataset in enumerate(normalized, start=1):
-            source_info = SourceInfo(
+        source_infos = [
+            SourceInfo(
                 datasource=guess_datasource(dataset.generated_path),
                 route=dataset.generated_path or "",
                 params={},
                 fetched_at=None,
                 request_id=None,
             )
+            for dataset in normalized
+        ]
+        # 先收集全部数据集的规划请求，LLM 规划器可一次调用完成多个决策
+        planned = self._plan_components_for_sources(
+            [
+                (source_info.route, infer_dataset_item_count(dataset))
+                for source_info, dataset in zip(source_infos, normalized)
+            ],
+            user_query=user_query,
+            layout_snapshot=layout_snapshot,
+        )
 
-            planned_components, planner_reasons, planner_engine = self._plan_components_for_source(
-                source_info.route,
-                user_query=user_query,
-                layout_snapshot=layout_snapshot,
-                item_count=infer_dataset_item_count(dataset),
-            )
+        for index, (dataset, source_info, plan_result) in enumerate(
+            zip(normalized, source_infos, planned), start=1
+        ):
+            planned_components, planner_reasons, planner_engine = plan_result
             planner_engines.append(planner_engine)
             planner_reasons_acc.extend([f"[dataset-{index}] {reason}" for reason in planner_reasons])
 
@@ -1177,42 +1188,61 @@ class ChatService:
             result.debug.setdefault("layout_snapshot", layout_snapshot)
         return result
 
-    def _plan_components_for_source(
+    def _plan_components_for_sources(
         self,
-        route: str,
+        sources: List[Tuple[str, int]],
         user_query: str,
         layout_snapshot: Optional[List[Dict[str, Any]]],
-        item_count: int,
+    ) -> List[Tuple[Optional[List[str]], List[str], str]]:
+        """为多个 (route, item_count) 规划组件：LLM 批量决策，未决的回退规则引擎。"""
+        requests = [
+            PlanRequest(
+                route=route,
+                manifest=get_route_manifest(route),
+                context=PlannerContext(
+                    item_count=item_count,
+                    user_preferences=(),
+                    raw_query=user_query,
+                    layout_mode=None,
+                    layout_snapshot=layout_snapshot,
+                ),
+                config=self.component_planner_config,
+            )
+            for route, item_count in sources
+        ]
+        llm_decisions: List[Optional[PlannerDecision]] = [None] * len(requests)
+        if self.llm_component_planner and self.llm_component_planner.is_available():
+            try:
+                llm_decisions = self.llm_component_planner.plan_batch(requests)
+            except Exception as exc:
+                logger.warning("LLM 组件规划失败，使用规则引擎: %s", exc)
+
+        return [
+            self._plan_components_for_source(request, llm_decision)
+            for request, llm_decision in zip(requests, llm_decisions)
+        ]
+
+    def _plan_components_for_source(
+        self,
+        request: PlanRequest,
+        llm_decision: Optional[PlannerDecision] = None,
     ) -> Tuple[Optional[List[str]], List[str], str]:
         planner_engine = "rule"
         planner_reasons: List[str] = []
         planned_components: Optional[List[str]] = None
 
         try:
-            planner_context = PlannerContext(
-                item_count=item_count,
-                user_preferences=(),
-                raw_query=user_query,
-                layout_mode=None,
-                layout_snapshot=layout_snapshot,
-            )
-            manifest = get_route_manifest(route)
-            decision = None
-            if self.llm_component_planner and self.llm_component_planner.is_available():
-                decision = self.llm_component_planner.plan(
-                    route=route,
-                    manifest=manifest,
-                    context=planner_context,
-                    config=self.component_planner_config,
-                )
-                if decision:
-                    planner_engine = "llm"
+            decision = llm_decision
+            if decision:
+                # 结果确定时 planner 不调用 LLM，单独标记以免误报为 LLM 决策
+                is_shortcut = decision.reasons[:1] == [SHORTCUT_REASON]
+                planner_engine = "shortcut" if is_shortcut else "llm"
             if decision is None:
                 decision = plan_components_for_route(
-                    route,
-                    config=self.component_planner_config,
-                    context=planner_context,
-                    manifest=manifest,
+                    request.route,
+                    config=request.config,
+                    context=request.context,
+                    manifest=request.manifest,
                 )
             if decision:
                 planner_reasons = decision.reasons
@@ -95,6 +95,7 @@ class DataQueryService:
         use_cache: bool = True,
         prefer_single_route: Optional[bool] = None,
         user_id: Optional[int] = None,  # Phase 2: 用户ID（游客模式可为 None）
+        query_embedding: Optional[Any] = None,  # 预先批量计算的查询向量（见 embed_queries）
     ) -> DataQueryResult:
         logger.info("开始数据查询: %s (user_id=%s)", user_query, user_id)
 
@@ -103,12 +104,13 @@ class DataQueryService:
 
         try:
             # RAG 流程（订阅解析已集成到 RAGInAction 内部）
-            rag_cache_key = user_query if not filter_datasource else f"{user_query}||{filter_datasource}"
+            rag_cache_key = self._rag_cache_key(user_query, filter_datasource)
             rag_result, rag_cache_hit = self._resolve_rag_result(
                 user_query=user_query,
                 filter_datasource=filter_datasource,
                 cache_key=rag_cache_key,
                 use_cache=use_cache,
+                query_embedding=query_embedding,
             )
             retrieved_tools = rag_result.get("retrieved_tools") or []
             rag_trace = self._build_rag_trace(rag_result)
@@ -252,6 +254,24 @@ class DataQueryService:
                 generated_path=generated_path,
             )
 
+    def embed_queries(self, queries: List[str]) -> Optional[Any]:
+        """
+        批量计算查询向量（一次模型调用），结果可逐条通过 query(query_embedding=...) 传入。
+
+        底层 RAG 流程不支持批量编码时返回 None。
+        """
+        embed = getattr(self.rag_in_action, "embed_queries", None)
+        if embed is None or not queries:
+            return None
+        return embed(queries)
+
+    def is_rag_cached(self, user_query: str, filter_datasource: Optional[str] = None) -> bool:
+        """RAG 结果是否已缓存（命中时 query 不会用到查询向量，调用方可跳过预编码）。"""
+        return self.cache.has_rag_cache(
+            self._rag_cache_key(user_query, filter_datasource),
+            filter_datasource=filter_datasource or "",
+        )
+
     def close(self):
         if self._own_executor and self.data_executor:
             self.data_executor.close()
@@ -265,12 +285,17 @@ class DataQueryService:
 
     # ===== 内部方法 =====
 
+    @staticmethod
+    def _rag_cache_key(user_query: str, filter_datasource: Optional[str]) -> str:
+        return user_query if not filter_datasource else f"{user_query}||{filter_datasource}"
+
     def _resolve_rag_result(
         self,
         user_query: str,
         filter_datasource: Optional[str],
         cache_key: str,
         use_cache: bool,
+        query_embedding: Optional[Any] = None,
     ) -> Tuple[Dict[str, Any], str]:
         cache_hit_type = "none"
         cached_rag_result = None
@@ -285,10 +310,14 @@ class DataQueryService:
             logger.debug("RAG 缓存命中")
             return cached_rag_result, "rag_cache"
 
+        process_kwargs: Dict[str, Any] = {}
+        if query_embedding is not None:
+            process_kwargs["query_embedding"] = query_embedding
         rag_result = self.rag_in_action.process(
             user_query=user_query,
             filter_datasource=filter_datasource,
             verbose=False,
+            **process_kwargs,
         )
         if use_cache:
             self.cache.set_rag_cache(
@@ -18,6 +18,8 @@ from ..utils import short_text, early_return_if_no_match
 from ..config_presets import list_panel_size_preset, statistic_card_size_preset, media_card_size_preset
 
 
+_IMG_SRC_PATTERN = re.compile(r'<img[^>]+src="([^"]+)"')
+
 USER_VIDEO_MANIFEST = RouteAdapterManifest(
     components=[
         ComponentManifestEntry(
@@ -169,7 +171,7 @@ def bilibili_user_video_adapter(
         content_html = item.get("content_html")
         cover_url = None
         if content_html:
-            img_match = re.search(r'<img[^>]+src="([^"]+)"', str(content_html))
+            img_match = _IMG_SRC_PATTERN.search(str(content_html))
             if img_match:
                 cover_url = img_match.group(1)
 
@@ -8,10 +8,11 @@ Route Adapter 注册与执行框架
 """
 from __future__ import annotations
 
+from bisect import insort
 from dataclasses import dataclass, field, replace
 import inspect
 from functools import wraps
-from typing import Any, Callable, Dict, List, Literal, Optional, Sequence
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
 
 from api.schemas.panel import ComponentInteraction, LayoutHint, SourceInfo
 
@@ -85,7 +86,7 @@ RouteAdapter = Callable[
 ]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ComponentManifestEntry:
     """
     组件清单条目。
@@ -111,6 +112,24 @@ class RouteAdapterManifest:
     """
     components: List[ComponentManifestEntry]  # 支持的组件列表
     notes: Optional[str] = None  # 适配器说明
+    components_by_id: Dict[str, ComponentManifestEntry] = field(
+        init=False, repr=False, compare=False
+    )  # component_id -> 条目索引，构造时生成，用于 O(1) 查找
+    required_ids: Tuple[str, ...] = field(
+        init=False, repr=False, compare=False
+    )  # 必选组件ID（按声明顺序），构造时生成
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "components_by_id",
+            {entry.component_id: entry for entry in self.components},
+        )
+        object.__setattr__(
+            self,
+            "required_ids",
+            tuple(entry.component_id for entry in self.components if entry.required),
+        )
 
 
 def _default_adapter(
@@ -135,6 +154,11 @@ def _default_adapter(
     )
 
 
+def _route_specificity(item: tuple[str, Any]) -> int:
+    """有序插入用的排序键：路由越长越靠前；等长时保持注册顺序。"""
+    return -len(item[0])
+
+
 class RouteAdapterRegistry:
     """
     路由适配器注册表
@@ -157,7 +181,8 @@ class RouteAdapterRegistry:
         """
         注册路由适配器
 
-        如果路由已存在则覆盖，注册后按路由长度降序排序（更具体的路由优先匹配）。
+        如果路由已存在则覆盖，新路由按长度降序有序插入（更具体的路由优先匹配），
+        无需每次注册后整体重排。
         """
         normalized = self._normalize(route)
         for idx, (existing_route, _) in enumerate(self._routes):
@@ -165,8 +190,7 @@ class RouteAdapterRegistry:
                 self._routes[idx] = (normalized, adapter)
                 break
         else:
-            self._routes.append((normalized, adapter))
-            self._routes.sort(key=lambda item: len(item[0]), reverse=True)
+            insort(self._routes, (normalized, adapter), key=_route_specificity)
 
         if manifest is not None:
             manifest_copy = replace(manifest, components=list(manifest.components))
@@ -175,8 +199,7 @@ class RouteAdapterRegistry:
                     self._manifests[idx] = (normalized, manifest_copy)
                     break
             else:
-                self._manifests.append((normalized, manifest_copy))
-                self._manifests.sort(key=lambda item: len(item[0]), reverse=True)
+                insort(self._manifests, (normalized, manifest_copy), key=_route_specificity)
 
     def get(self, route: str) -> RouteAdapter:
         """
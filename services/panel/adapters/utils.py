@@ -14,6 +14,10 @@ if TYPE_CHECKING:
     from .registry import AdapterExecutionContext, RouteAdapterResult
 
 
+_HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
 def strip_html(value: str | None) -> str:
     """
     清理HTML标签和实体编码
@@ -25,9 +29,9 @@ def strip_html(value: str | None) -> str:
     if not value:
         return ""
     # 移除所有HTML标签
-    text = re.sub(r"<[^>]+>", " ", value)
+    text = _HTML_TAG_PATTERN.sub(" ", value)
     # 合并连续空格
-    text = re.sub(r"\s+", " ", text)
+    text = _WHITESPACE_PATTERN.sub(" ", text)
     # 解码HTML实体
     return unescape(text).strip()
 
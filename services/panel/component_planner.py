@@ -37,7 +37,7 @@ _COMPONENT_TAGS = {
 }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ComponentPlannerConfig:
     """
     组件规划器配置。
@@ -52,8 +52,13 @@ class ComponentPlannerConfig:
     preferred_components: Sequence[str] = ()
     allow_optional: bool = True
 
+    def __post_init__(self) -> None:
+        # 统一为元组：构造时复制一次，之后可直接用于缓存键与 prompt
+        if not isinstance(self.preferred_components, tuple):
+            object.__setattr__(self, "preferred_components", tuple(self.preferred_components))
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class PlannerContext:
     """
     规划器运行时上下文。
@@ -71,6 +76,11 @@ class PlannerContext:
     layout_mode: Optional[str] = None
     layout_snapshot: Optional[List[Dict[str, Any]]] = None
 
+    def __post_init__(self) -> None:
+        # 统一为元组：构造时复制一次，之后可直接用于缓存键与 prompt
+        if not isinstance(self.user_preferences, tuple):
+            object.__setattr__(self, "user_preferences", tuple(self.user_preferences))
+
 
 @dataclass
 class PlannerDecision:
@@ -127,7 +137,7 @@ def plan_components_for_route(
     reasons: List[str] = []
 
     # 收集必选组件
-    required = [entry.component_id for entry in manifest.components if entry.required]
+    required = manifest.required_ids
     selected: List[str] = []
     seen: Set[str] = set()
 
@@ -3,10 +3,10 @@
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import AbstractSet, Dict, Iterable, List, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ComponentDefinition:
     """组件能力表中的单个组件定义。"""
 
@@ -18,9 +18,13 @@ class ComponentDefinition:
     layout_defaults: Dict[str, object] = field(default_factory=dict)
     description: Optional[str] = None
 
-    def is_compatible(self, available_fields: List[str]) -> bool:
-        """检查可用语义标签是否满足组件的必需字段。"""
-        available = set(available_fields)
+    def is_compatible(self, available_fields: Iterable[str]) -> bool:
+        """检查可用语义标签是否满足组件的必需字段（传入集合时不再重复转换）。"""
+        available = (
+            available_fields
+            if isinstance(available_fields, AbstractSet)
+            else set(available_fields)
+        )
         return all(req in available for req in self.requirements)
 
 
@@ -36,13 +40,14 @@ class ComponentRegistry:
     def all(self) -> List[ComponentDefinition]:
         return list(self._components.values())
 
-    def find_compatible(self, available_fields: List[str]) -> List[ComponentDefinition]:
+    def find_compatible(self, available_fields: Iterable[str]) -> List[ComponentDefinition]:
         """根据可用字段返回可兼容的组件列表。"""
+        available = frozenset(available_fields)
         return [
             component
             for component in self._components.values()
-            if component.is_compatible(available_fields)
-    ]
+            if component.is_compatible(available)
+        ]
 
 
 def default_components() -> List[ComponentDefinition]:
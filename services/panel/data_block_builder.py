@@ -4,7 +4,8 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict, is_dataclass
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from itertools import islice
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from api.schemas.panel import DataBlock, SchemaSummary, SourceInfo
@@ -17,7 +18,13 @@ from services.panel.adapters import (
 from services.panel.schema_summary import SchemaSummaryBuilder
 
 
-@dataclass
+# dataclass 类型 -> 字段名元组，避免每条记录都走 asdict 的递归深拷贝
+_DC_FIELDS_CACHE: Dict[type, Tuple[str, ...]] = {}
+# 需要 asdict 递归转换的字段值：嵌套 dataclass 以及可能包含 dataclass 的容器
+_NESTED_TYPES = (list, tuple, dict, set, frozenset)
+
+
+@dataclass(frozen=True, slots=True)
 class BlockBuildResult:
     data_block: DataBlock
     block_plans: List[AdapterBlockPlan]
@@ -38,8 +45,7 @@ class DataBlockBuilder:
         requested_components: Optional[Sequence[str]] = None,
     ) -> BlockBuildResult:
         adapter_result = self._apply_adapter(source_info, records, requested_components)
-        normalized_records, canonical_records = self._prepare_records(adapter_result.records)
-        schema_summary = self._build_schema_summary(canonical_records)
+        normalized_records, schema_summary = self._prepare_and_summarize(adapter_result.records)
 
         merged_stats = stats.copy() if stats else {}
         merged_stats.setdefault("total", len(adapter_result.records))
@@ -95,20 +101,36 @@ class DataBlockBuilder:
         context = AdapterExecutionContext(requested_components=requested_components)
         return adapter(source_info, record_dicts, context)
 
-    def _prepare_records(self, records: Sequence[Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        trimmed = list(records)[: self.max_records]
-        normalized = [self._record_to_dict(record) for record in trimmed]
-        return normalized, normalized
+    def _prepare_and_summarize(self, records: Iterable[Any]) -> Tuple[List[Dict[str, Any]], SchemaSummary]:
+        """单次遍历完成截断、字典化与 Schema 统计。
 
-    def _build_schema_summary(self, records: Iterable[Dict[str, Any]]) -> SchemaSummary:
-        return self.schema_builder.build(records)
+        adapter 输出的字典记录归本次构建所有，直接复用而不再拷贝一份。
+        """
+        accumulator = self.schema_builder.accumulator()
+        normalized: List[Dict[str, Any]] = []
+        for record in islice(records, self.max_records):
+            record_dict = record if type(record) is dict else self._record_to_dict(record)
+            normalized.append(record_dict)
+            accumulator.observe(record_dict)
+        return normalized, accumulator.finalize()
 
     @staticmethod
     def _record_to_dict(record: Any) -> Dict[str, Any]:
         if isinstance(record, dict):
             return dict(record)
-        if is_dataclass(record):
-            return dict(asdict(record))
+        record_type = type(record)
+        field_names = _DC_FIELDS_CACHE.get(record_type)
+        if field_names is None and is_dataclass(record_type):
+            field_names = tuple(f.name for f in fields(record_type))
+            _DC_FIELDS_CACHE[record_type] = field_names
+        if field_names is not None:
+            values = {name: getattr(record, name) for name in field_names}
+            # 仅当字段值均为标量时浅取值与 asdict 等价；否则交给 asdict 递归转换，
+            # 保证 Schema 推断与 adapter 看到的是字典/列表而不是原始对象
+            for value in values.values():
+                if isinstance(value, _NESTED_TYPES) or is_dataclass(value):
+                    return asdict(record)
+            return values
         if hasattr(record, "model_dump"):
             try:
                 return dict(record.model_dump())
@@ -3,15 +3,27 @@
 """
 
 import uuid
-import math
-from typing import Dict, List, Optional
+from typing import ClassVar, Dict, List, Optional, Tuple
 
 from api.schemas.panel import LayoutHint, LayoutNode, LayoutTree, UIBlock
 
 
+_GRID_COLUMNS = 12
+
+
 class LayoutEngine:
     """依据组件顺序生成布局树结构。"""
 
+    # layout_size -> 栅格宽度（基于 12 列栅格预先计算）
+    _LAYOUT_SIZE_SPANS: ClassVar[Dict[str, int]] = {
+        "quarter": max(1, round(_GRID_COLUMNS * 0.25)),
+        "third": max(1, round(_GRID_COLUMNS * (1 / 3))),
+        "half": max(1, round(_GRID_COLUMNS * 0.5)),
+        "full": _GRID_COLUMNS,
+    }
+    # 原样透传到节点 props 的 LayoutHint 属性（值为 None 时跳过）
+    _HINT_PROP_KEYS: ClassVar[Tuple[str, ...]] = ("order", "priority", "min_height")
+
     def build(
         self,
         mode: str,
@@ -23,18 +35,13 @@ class LayoutEngine:
         nodes: List[LayoutNode] = []
         batch_id = uuid.uuid4().hex[:8]
 
-        grid_columns = 12
+        grid_columns = _GRID_COLUMNS
         base_row_height = 220
         current_x = 0
         current_y = 0
         current_row_height = 1
 
-        layout_size_spans = {
-            "quarter": max(1, round(grid_columns * 0.25)),
-            "third": max(1, round(grid_columns * (1 / 3))),
-            "half": max(1, round(grid_columns * 0.5)),
-            "full": grid_columns,
-        }
+        layout_size_spans = self._LAYOUT_SIZE_SPANS
 
         for index, block in enumerate(blocks, start=1):
             node_id = f"row-{batch_id}-{index}"
@@ -71,25 +78,23 @@ class LayoutEngine:
             else:
                 props["span"] = width_units
 
-            if hint and hint.order is not None:
-                props["order"] = hint.order
-            if hint and hint.priority is not None:
-                props["priority"] = hint.priority
-            if hint and hint.min_height is not None:
-                props["min_height"] = hint.min_height
-            if hint and hint.responsive:
-                props["responsive"] = hint.responsive
+            if hint:
+                for key in self._HINT_PROP_KEYS:
+                    value = getattr(hint, key)
+                    if value is not None:
+                        props[key] = value
+                if hint.responsive:
+                    props["responsive"] = hint.responsive
             if layout_size:
-                props.setdefault("layout", {})
-                if isinstance(props["layout"], dict):
-                    props["layout"]["size"] = layout_size
+                props["layout"] = {"size": layout_size}
 
             min_height = None
             if hint and hint.min_height is not None:
                 min_height = hint.min_height
             elif block.options:
                 min_height = block.options.get("min_height") or block.options.get("minHeight")
-            height_units = max(1, math.ceil((min_height or base_row_height) / base_row_height))
+            # 整数向上取整除法，min_height 为浮点时结果转回 int
+            height_units = max(1, int(-(-(min_height or base_row_height) // base_row_height)))
 
             if current_x + width_units > grid_columns:
                 current_x = 0
@@ -101,7 +106,7 @@ class LayoutEngine:
                 "y": current_y,
                 "w": width_units,
                 "h": height_units,
-                "minH": max(1, math.ceil((min_height or base_row_height) / base_row_height)),
+                "minH": height_units,
             }
             if layout_size:
                 props["grid"]["size"] = layout_size
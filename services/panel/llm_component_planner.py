@@ -11,6 +11,10 @@ LLM 组件规划器（LLM Component Planner）
 
 特性：
   - 缓存机制：避免重复调用 LLM（默认缓存 32 条决策）
+  - 异步规划：aplan 等待 LLM 客户端的 agenerate，多个数据块可并发规划
+  - 批量规划：plan_batch 将多个数据块打包进一次 LLM 调用，摊薄往返开销
+  - 请求合并：相同缓存键的并发请求只发起一次 LLM 调用，其余等待其结果
+  - 语义缓存（可选）：注入向量模型后，措辞不同但语义相近的查询复用已有决策
   - 结构化 prompt：包含 manifest、用户查询、配置约束
   - JSON 验证：确保 LLM 返回格式正确
 
@@ -23,9 +27,15 @@ LLM 组件规划器（LLM Component Planner）
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Any, Dict, Optional
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Sequence, Tuple
 
 from query_processor.config import llm_settings
 from query_processor.llm_client import LLMClient, create_llm_client
@@ -37,8 +47,79 @@ from services.panel.component_planner import (
     PlannerDecision,
 )
 
+if TYPE_CHECKING:
+    # 语义缓存为可选功能：numpy 仅在注入 embedding_model 后于语义缓存方法内导入
+    import numpy as np
+
+try:  # 可选依赖：orjson 为 C 实现，序列化 prompt 比标准库快数倍
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+# markdown 代码块（```json ... ```），一次扫描取出第一个代码块的内容
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+# 跳过 LLM 的确定性决策在 reasons 首位带此标记，调用方据此上报 "shortcut" 引擎
+SHORTCUT_REASON = "engine: llm-skipped"
+
+
+def _dump_prompt_json(payload: Dict[str, Any]) -> str:
+    """将 prompt 载荷序列化为缩进 JSON（优先使用 orjson，缺失时回退标准库）。"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def _loads_json(text: str) -> Any:
+    """解析 JSON 文本（优先使用 orjson；其 JSONDecodeError 是标准库同名异常的子类）。"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _freeze(value: Any) -> Hashable:
+    """递归地将 dict/list/set 转换为可哈希的元组，用于构造缓存键。"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class _ManifestCacheEntry:
+    """单个 manifest 实例的派生数据（只依赖 manifest，计算一次后复用）。"""
+
+    manifest: RouteAdapterManifest  # 持有引用，保证 id 在缓存期间不会被复用
+    component_lines: List[Dict[str, Any]]
+    fingerprint: Hashable
+    lines_json: str  # 组件行的 JSON，已按 prompt 根对象成员的层级缩进
+
+
+@dataclass(slots=True)
+class _LoopState:
+    """单个事件循环内的 aplan 状态：Semaphore 与 Future 只能在创建它们的事件循环中等待。"""
+
+    semaphore: Optional[asyncio.Semaphore]
+    # 进行中的异步 LLM 调用：cache_key -> 共享结果（仅由本事件循环的协程读写）
+    inflight: Dict[Tuple[Hashable, ...], asyncio.Future] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class PlanRequest:
+    """plan_batch 的单条规划请求（参数与 plan 一致）。"""
+
+    route: str
+    manifest: Optional[RouteAdapterManifest]
+    context: PlannerContext
+    config: ComponentPlannerConfig
+
 
 class LLMComponentPlanner:
     """
@@ -51,19 +132,56 @@ class LLMComponentPlanner:
       - 缓存决策结果，避免重复调用
     """
 
-    def __init__(self, llm_client: Optional[LLMClient] = None, cache_size: int = 32):
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        cache_size: int = 32,
+        max_concurrency: Optional[int] = None,
+        batch_size: int = 8,
+        embedding_model: Optional[Any] = None,
+        semantic_threshold: float = 0.92,
+        inflight_wait_timeout: float = 60.0,
+    ):
         """
         初始化 LLM 组件规划器。
 
         Args:
             llm_client: LLM 客户端实例（可选，默认从配置创建）
             cache_size: 缓存容量（默认 32 条）
+            max_concurrency: aplan 同时进行的 LLM 调用上限（None 表示不限制）
+            batch_size: plan_batch 单次 LLM 调用最多打包的请求数
+            embedding_model: 向量模型（需提供 encode(texts) -> ndarray，
+                如 rag_system.EmbeddingModel）；为 None 时只使用精确缓存
+            semantic_threshold: 语义缓存命中所需的最小余弦相似度
+            inflight_wait_timeout: 等待相同缓存键进行中的 LLM 调用的最长时间（秒），
+                超时后放弃等待并返回 None（由调用方回退规则引擎）
 
         Note:
             如果 LLM 客户端初始化失败，planner 会自动降级为不可用状态
         """
         self._cache_size = cache_size
-        self._cache: Dict[str, PlannerDecision] = {}  # 缓存字典：cache_key -> PlannerDecision
+        self._batch_size = max(1, batch_size)
+        # LRU 缓存：cache_key -> PlannerDecision（命中移到末尾，淘汰最前）
+        self._cache: OrderedDict[Tuple[Hashable, ...], PlannerDecision] = OrderedDict()
+        # planner 为多线程共享的单例：OrderedDict 的查找+移动/淘汰需整体加锁
+        self._cache_lock = threading.Lock()
+        # 语义缓存：除 raw_query 外的缓存键 -> (归一化查询向量矩阵, 对应决策)
+        self._embedding_model = embedding_model
+        self._semantic_threshold = semantic_threshold
+        self._semantic_cache: OrderedDict[
+            Tuple[Hashable, ...], Tuple[np.ndarray, List[PlannerDecision]]
+        ] = OrderedDict()
+        self._query_vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+        # manifest 派生数据缓存：id(manifest) -> _ManifestCacheEntry
+        self._manifest_cache: Dict[int, _ManifestCacheEntry] = {}
+        # 限制并发的异步 LLM 调用数，避免触发服务商限流；信号量按事件循环懒创建
+        self._max_concurrency = max_concurrency
+        # 进行中的 LLM 调用（single-flight）：cache_key -> 完成信号
+        self._inflight_lock = threading.Lock()
+        self._inflight_wait_timeout = inflight_wait_timeout
+        self._inflight_events: Dict[Tuple[Hashable, ...], threading.Event] = {}
+        # 事件循环 -> _LoopState：planner 为单例，可能被多个线程各自的事件循环使用
+        self._loop_states: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
         try:
             self.client = llm_client or create_llm_client(
                 llm_settings.llm_provider,
@@ -115,49 +233,259 @@ class LLMComponentPlanner:
             6. 应用 max_components 限制
             7. 存入缓存
         """
-        if not self.client or manifest is None:
+        if not self._can_plan(manifest, context):
             return None
+        shortcut = self._shortcut_decision(manifest, context)
+        if shortcut is not None:
+            return shortcut
 
         # 检查缓存
         cache_key = self._cache_key(route, manifest, context, config)
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        # 相同缓存键已有调用进行中：等待其完成后读取缓存，不重复调用 LLM
+        with self._inflight_lock:
+            event = self._inflight_events.get(cache_key)
+            leader = event is None
+            if leader:
+                event = self._inflight_events[cache_key] = threading.Event()
+        if not leader:
+            # 领头调用挂起时不能让等待方一起无限阻塞：超时即放弃，交给规则引擎
+            if not event.wait(self._inflight_wait_timeout):
+                logger.warning(
+                    "等待进行中的 LLM 规划超时 (%.1fs)，回退规则引擎", self._inflight_wait_timeout
+                )
+                return None
+            return self._get_cached(cache_key)
 
-        # 构建 prompt 并调用 LLM
-        prompt = self._build_prompt(route, manifest, context, config)
         try:
-            # 使用较低的 temperature 确保输出稳定性
-            raw = self.client.generate(
-                prompt,
-                temperature=min(llm_settings.llm_temperature, 0.5),
-                max_tokens=min(llm_settings.llm_max_tokens, 800),
-            )
-        except Exception as exc:  # pragma: no cover - network failure
-            logger.warning("LLM planner call failed: %s", exc)
+            # 构建 prompt 并调用 LLM
+            prompt = self._build_prompt(route, manifest, context, config)
+            try:
+                raw = self.client.generate(prompt, **self._generation_kwargs())
+            except Exception as exc:  # pragma: no cover - network failure
+                logger.warning("LLM planner call failed: %s", exc)
+                return None
+
+            return self._finalize_decision(raw, cache_key, manifest, config)
+        finally:
+            with self._inflight_lock:
+                self._inflight_events.pop(cache_key, None)
+            event.set()
+
+    async def aplan(
+        self,
+        *,
+        route: str,
+        manifest: Optional[RouteAdapterManifest],
+        context: PlannerContext,
+        config: ComponentPlannerConfig,
+    ) -> Optional[PlannerDecision]:
+        """
+        plan 的异步版本：等待 LLM 客户端的 agenerate，不阻塞事件循环。
+
+        多个数据块可通过 asyncio.gather 并发规划，网络等待相互重叠；
+        缓存查询与写入仍为同步字典操作。相同缓存键的并发调用共享同一次 LLM 请求。
+        """
+        if not self._can_plan(manifest, context):
             return None
+        shortcut = self._shortcut_decision(manifest, context)
+        if shortcut is not None:
+            return shortcut
+
+        cache_key = self._cache_key(route, manifest, context, config)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        state = self._loop_state()
+        inflight = state.inflight.get(cache_key)
+        if inflight is not None:
+            # shield：等待方被取消时不影响共享的调用
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        state.inflight[cache_key] = future
+        decision: Optional[PlannerDecision] = None
+        try:
+            prompt = self._build_prompt(route, manifest, context, config)
+            try:
+                if state.semaphore is None:
+                    raw = await self.client.agenerate(prompt, **self._generation_kwargs())
+                else:
+                    async with state.semaphore:
+                        raw = await self.client.agenerate(prompt, **self._generation_kwargs())
+            except Exception as exc:  # pragma: no cover - network failure
+                logger.warning("LLM planner call failed: %s", exc)
+                return None
 
-        # 解析 LLM 响应
+            decision = self._finalize_decision(raw, cache_key, manifest, config)
+            return decision
+        finally:
+            # 无论成功、失败或被取消，都唤醒等待方（失败时它们得到 None）
+            state.inflight.pop(cache_key, None)
+            future.set_result(decision)
+
+    def _loop_state(self) -> _LoopState:
+        """返回当前事件循环的 aplan 状态（首次使用时创建）。"""
+        loop = asyncio.get_running_loop()
+        with self._inflight_lock:
+            state = self._loop_states.get(loop)
+            if state is None:
+                semaphore = asyncio.Semaphore(self._max_concurrency) if self._max_concurrency else None
+                state = self._loop_states[loop] = _LoopState(semaphore=semaphore)
+        return state
+
+    def plan_batch(self, requests: Sequence[PlanRequest]) -> List[Optional[PlannerDecision]]:
+        """
+        批量规划：将多个请求打包进一次 LLM 调用。
+
+        Args:
+            requests: 规划请求列表
+
+        Returns:
+            与 requests 一一对应的 PlannerDecision（不可规划时为 None）
+
+        处理流程：
+            1. 跳过不可规划的请求，缓存命中的直接填充
+            2. 剩余请求按 batch_size 分组，每组一次 LLM 调用，输出 {"results": [...]}
+            3. 批量结果中缺失或非法的条目，回退为单条 plan()
+            4. LLM 调用失败的分组不再重试，对应结果为 None
+        """
+        results: List[Optional[PlannerDecision]] = [None] * len(requests)
+        pending: List[Tuple[int, Tuple[Hashable, ...]]] = []
+        for index, request in enumerate(requests):
+            if not self._can_plan(request.manifest, request.context):
+                continue
+            shortcut = self._shortcut_decision(request.manifest, request.context)
+            if shortcut is not None:
+                results[index] = shortcut
+                continue
+            cache_key = self._cache_key(
+                request.route, request.manifest, request.context, request.config
+            )
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, cache_key))
+
+        for start in range(0, len(pending), self._batch_size):
+            chunk = pending[start : start + self._batch_size]
+            if len(chunk) == 1:
+                index, _ = chunk[0]
+                results[index] = self._plan_request(requests[index])
+                continue
+
+            prompt = self._build_batch_prompt([requests[index] for index, _ in chunk])
+            try:
+                raw = self.client.generate(prompt, **self._generation_kwargs())
+            except Exception as exc:  # pragma: no cover - network failure
+                # 调用本身失败时逐条重试只会重复失败，这一组保持 None
+                logger.warning("LLM planner batch call failed: %s", exc)
+                continue
+
+            payloads = self._parse_batch_response(raw, len(chunk))
+            for (index, cache_key), data in zip(chunk, payloads):
+                request = requests[index]
+                decision = None
+                if data is not None:
+                    decision = self._decision_from_payload(
+                        data, cache_key, request.manifest, request.config
+                    )
+                results[index] = decision or self._plan_request(request)
+        return results
+
+    def _plan_request(self, request: PlanRequest) -> Optional[PlannerDecision]:
+        return self.plan(
+            route=request.route,
+            manifest=request.manifest,
+            context=request.context,
+            config=request.config,
+        )
+
+    def _can_plan(
+        self, manifest: Optional[RouteAdapterManifest], context: PlannerContext
+    ) -> bool:
+        """
+        判断是否值得交给 LLM 规划。
+
+        空 manifest 不可能选出任何组件；没有数据且没有必选组件时，
+        交给规则引擎即可得到确定的结果。
+        """
+        if not self.client or manifest is None or not manifest.components:
+            return False
+        return context.item_count != 0 or bool(manifest.required_ids)
+
+    @staticmethod
+    def _shortcut_decision(
+        manifest: RouteAdapterManifest, context: PlannerContext
+    ) -> Optional[PlannerDecision]:
+        """
+        结果确定、无需调用 LLM 的情形。
+
+        不写入缓存：判断本身是 O(1)，且缓存键不含 item_count，
+        写入后会被数据量不同的同一查询误命中。
+        """
+        if len(manifest.components) == 1:
+            return PlannerDecision(
+                components=[manifest.components[0].component_id],
+                reasons=[SHORTCUT_REASON, "manifest declares a single component"],
+            )
+        if context.item_count == 0:
+            return PlannerDecision(
+                components=list(manifest.required_ids),
+                reasons=[SHORTCUT_REASON, "no data items; keeping required components only"],
+            )
+        return None
+
+    @staticmethod
+    def _generation_kwargs() -> Dict[str, Any]:
+        """LLM 生成参数：使用较低的 temperature 确保输出稳定性。"""
+        return {
+            "temperature": min(llm_settings.llm_temperature, 0.5),
+            "max_tokens": min(llm_settings.llm_max_tokens, 800),
+        }
+
+    def _finalize_decision(
+        self,
+        raw: str,
+        cache_key: Tuple[Hashable, ...],
+        manifest: RouteAdapterManifest,
+        config: ComponentPlannerConfig,
+    ) -> Optional[PlannerDecision]:
+        """解析 LLM 响应、校验组件并写入缓存（plan 与 aplan 共用）。"""
         data = self._parse_response(raw)
         if not data:
             return None
+        return self._decision_from_payload(data, cache_key, manifest, config)
 
+    def _decision_from_payload(
+        self,
+        data: Dict[str, Any],
+        cache_key: Tuple[Hashable, ...],
+        manifest: RouteAdapterManifest,
+        config: ComponentPlannerConfig,
+    ) -> Optional[PlannerDecision]:
+        """将校验后的 {selected, reasons} 转换为决策并写入缓存。"""
         # 验证组件有效性（过滤不存在的组件 ID）
-        manifest_components = {entry.component_id for entry in manifest.components}
         # NOTE: data["selected"] 和 data["reasons"] 已由 _parse_response 验证存在
         selected = [
-            component for component in data["selected"] if component in manifest_components
+            component
+            for component in data["selected"]
+            if component in manifest.components_by_id
         ]
         if not selected:
             return None
 
-        # 补充必选组件（如果 LLM 遗漏）
-        required = [entry.component_id for entry in manifest.components if entry.required]
-        for component in required:
-            if component not in selected:
-                selected.insert(0, component)
+        # 必选组件排在最前（LLM 遗漏时自动补充），再按 LLM 给出的顺序去重合并，
+        # 保证 max_components 截断时不会丢掉必选组件
+        selected = list(dict.fromkeys([*manifest.required_ids, *selected]))
 
         # 应用 max_components 限制
-        selected = selected[: config.max_components or len(selected)]
+        selected = selected[: config.max_components or None]
         reasons = data["reasons"]
         reasons.insert(0, "engine: llm")
         decision = PlannerDecision(components=selected, reasons=reasons)
@@ -185,48 +513,122 @@ class LLMComponentPlanner:
         Returns:
             格式化的 prompt 字符串（包含 JSON 格式的输入）
         """
-        # 提取组件清单信息
-        component_lines = []
-        for entry in manifest.components:
-            component_lines.append(
-                {
-                    "component_id": entry.component_id,
-                    "description": entry.description,
-                    "cost": entry.cost,
-                    "default_selected": entry.default_selected,
-                    "required": entry.required,
-                    "hints": entry.hints,
-                    "field_requirements": entry.field_requirements,
-                }
-            )
-
         payload = {
             "instruction": (
                 "You are a UI component planner. Based on the manifest and user intent, "
                 "choose the best components. Output valid JSON."
             ),
+            **self._request_payload(route, manifest, context, config, include_manifest=False),
+        }
+        # manifest 是载荷的最后一个键：只序列化可变部分，
+        # 再把缓存的 manifest 片段拼接到根对象的结尾花括号之前
+        body = _dump_prompt_json(payload)
+        body = f'{body[:-2]},\n  "manifest": {self._manifest_json(manifest)}\n}}'
+
+        return (
+            "Decide which components to render. Return JSON with keys "
+            '`selected` (array of component ids) and `reasons` (same length array). '
+            "Use only the manifest contract and planner context; ignore runtime payload details.\n"
+            f"{body}"
+        )
+
+    def _build_batch_prompt(self, requests: Sequence[PlanRequest]) -> str:
+        """构建批量 prompt：batch 中每一项与单条 prompt 的载荷相同。"""
+        payload = {
+            "instruction": (
+                "You are a UI component planner. For every item in `batch`, based on its "
+                "manifest and user intent, choose the best components. Output valid JSON."
+            ),
+            "batch": [
+                self._request_payload(
+                    request.route, request.manifest, request.context, request.config
+                )
+                for request in requests
+            ],
+        }
+
+        return (
+            "Decide which components to render for each batch item. Return JSON with key "
+            '`results`: an array with exactly one object per batch item, in the same order, '
+            'each with keys `selected` (array of component ids) and `reasons` (same length array). '
+            "Use only the manifest contract and planner context; ignore runtime payload details.\n"
+            f"{_dump_prompt_json(payload)}"
+        )
+
+    def _request_payload(
+        self,
+        route: str,
+        manifest: RouteAdapterManifest,
+        context: PlannerContext,
+        config: ComponentPlannerConfig,
+        *,
+        include_manifest: bool = True,
+    ) -> Dict[str, Any]:
+        """单条规划请求的 prompt 载荷（单条与批量 prompt 共用）。"""
+        payload = {
             "route": route,
             "constraints": {
                 "max_components": config.max_components,
                 "allow_optional": config.allow_optional,
-                "preferred_components": list(config.preferred_components),
+                "preferred_components": config.preferred_components,
             },
             "contract_notes": manifest.notes,
             "context": {
                 "user_query": context.raw_query,
                 "layout_mode": context.layout_mode,
-                "user_preferences": list(context.user_preferences),
+                "user_preferences": context.user_preferences,
                 "item_count": context.item_count,
             },
-            "manifest": component_lines,
         }
+        if include_manifest:
+            payload["manifest"] = self._manifest_lines(manifest)
+        return payload
 
-        return (
-            "Decide which components to render. Return JSON with keys "
-            '`selected` (array of component ids) and `reasons` (same length array). '
-            "Use only the manifest contract and planner context; ignore runtime payload details.\n"
-            f"{json.dumps(payload, ensure_ascii=False, indent=2)}"
+    def _manifest_lines(self, manifest: RouteAdapterManifest) -> List[Dict[str, Any]]:
+        """获取 manifest 的组件清单信息（按 manifest 实例缓存）。"""
+        return self._manifest_entry(manifest).component_lines
+
+    def _manifest_fingerprint(self, manifest: RouteAdapterManifest) -> Hashable:
+        """获取 manifest 的可哈希指纹（用于缓存键，按 manifest 实例缓存）。"""
+        return self._manifest_entry(manifest).fingerprint
+
+    def _manifest_json(self, manifest: RouteAdapterManifest) -> str:
+        """获取 manifest 组件行序列化后的 JSON 片段（按 manifest 实例缓存）。"""
+        return self._manifest_entry(manifest).lines_json
+
+    def _manifest_entry(self, manifest: RouteAdapterManifest) -> _ManifestCacheEntry:
+        """
+        转换并缓存 manifest 的组件行、指纹与 JSON 片段。
+
+        manifest 注册后不再变化，这些派生数据只需计算一次。
+        """
+        cached = self._manifest_cache.get(id(manifest))
+        if cached is not None and cached.manifest is manifest:
+            return cached
+
+        component_lines = [
+            {
+                "component_id": entry.component_id,
+                "description": entry.description,
+                "cost": entry.cost,
+                "default_selected": entry.default_selected,
+                "required": entry.required,
+                "hints": entry.hints,
+                "field_requirements": entry.field_requirements,
+            }
+            for entry in manifest.components
+        ]
+        entry = _ManifestCacheEntry(
+            manifest=manifest,
+            component_lines=component_lines,
+            fingerprint=(manifest.notes, _freeze(component_lines)),
+            # 作为根对象成员嵌入时，每一行需多缩进一级
+            lines_json=_dump_prompt_json(component_lines).replace("\n", "\n  "),
         )
+        if len(self._manifest_cache) >= self._cache_size:
+            self._manifest_cache.pop(next(iter(self._manifest_cache)))
+        self._manifest_cache[id(manifest)] = entry
+        return entry
 
     @staticmethod
     def _parse_response(raw: str) -> Optional[Dict[str, Any]]:
@@ -236,7 +638,7 @@ class LLMComponentPlanner:
         容错处理：
             1. 移除 markdown 代码块标记（```json ... ```）
             2. 尝试直接解析 JSON
-            3. 如果失败，尝试提取第一个 JSON 对象（{...}）
+            3. 如果失败，提取文本中第一个完整的 JSON 对象（{...}）
 
         类型验证：
             - 确保返回的是字典
@@ -250,29 +652,69 @@ class LLMComponentPlanner:
             包含 "selected" 和 "reasons" 键的字典
             若解析失败或格式不正确，返回 None
         """
+        return LLMComponentPlanner._validate_payload(
+            LLMComponentPlanner._load_json_object(raw)
+        )
+
+    @staticmethod
+    def _parse_batch_response(raw: str, expected: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        解析批量响应 {"results": [...]}，按下标逐条校验。
+
+        Returns:
+            长度为 expected 的列表；缺失或非法的条目为 None
+        """
+        data = LLMComponentPlanner._load_json_object(raw)
+        items = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            return [None] * expected
+        payloads = [LLMComponentPlanner._validate_payload(item) for item in items[:expected]]
+        payloads.extend([None] * (expected - len(payloads)))
+        return payloads
+
+    @staticmethod
+    def _load_json_object(raw: str) -> Optional[Any]:
+        """从 LLM 响应文本中取出 JSON（容忍代码块与说明文字）。"""
         if not raw:
             return None
         raw = raw.strip()
 
+        # 快速路径：响应本身就是 JSON 对象（最常见情况），无需处理代码块
+        if raw[:1] == "{" and raw[-1:] == "}":
+            try:
+                return _loads_json(raw)
+            except json.JSONDecodeError:
+                pass
+
         # 处理 markdown 代码块（LLM 常见输出格式）
-        if "```" in raw:
-            start = raw.find("```")
-            end = raw.rfind("```")
-            snippet = raw[start + 3 : end]
-            if snippet.strip().startswith("json"):
-                snippet = snippet.strip()[4:]
-            raw = snippet.strip()
+        match = _FENCE_RE.search(raw)
+        if match:
+            raw = match.group(1)
         try:
-            data = json.loads(raw)
+            return _loads_json(raw)
         except json.JSONDecodeError:
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start == -1 or end == -1:
-                return None
+            return LLMComponentPlanner._extract_first_object(raw)
+
+    @staticmethod
+    def _extract_first_object(raw: str) -> Optional[Any]:
+        """
+        从夹杂说明文字的文本中提取第一个完整的 JSON 对象。
+
+        从每个 "{" 处尝试 raw_decode，解码器在对象结束处停止，
+        不受字符串内花括号或对象之后其它文字的影响。
+        """
+        start = raw.find("{")
+        while start != -1:
             try:
-                data = json.loads(raw[start : end + 1])
+                data, _ = _JSON_DECODER.raw_decode(raw, start)
+                return data
             except json.JSONDecodeError:
-                return None
+                start = raw.find("{", start + 1)
+        return None
+
+    @staticmethod
+    def _validate_payload(data: Any) -> Optional[Dict[str, Any]]:
+        """校验解析结果包含字符串列表形式的 selected 与 reasons。"""
         if not isinstance(data, dict):
             return None
         selected = data.get("selected")
@@ -289,13 +731,13 @@ class LLMComponentPlanner:
         manifest: RouteAdapterManifest,
         context: PlannerContext,
         config: ComponentPlannerConfig,
-    ) -> str:
+    ) -> Tuple[Hashable, ...]:
         """
         生成缓存键。
 
         缓存键包含所有影响决策的因素：
             - route: 路由标识
-            - manifest: 组件清单的指纹（component_ids）
+            - manifest: 组件清单的指纹（按实例缓存）
             - context: 用户查询、布局模式、用户偏好
             - config: max_components, allow_optional, preferred_components
 
@@ -306,74 +748,112 @@ class LLMComponentPlanner:
             config: 规划配置
 
         Returns:
-            JSON 格式的缓存键（确保键的稳定性和唯一性）
+            元组形式的缓存键（可直接哈希，无需序列化）；
+            raw_query 固定位于下标 2，语义缓存按其余部分分组
         """
-        return json.dumps(
-            {
-                "route": route,
-                "manifest": self._manifest_fingerprint(manifest),
-                "user_query": context.raw_query,
-                "layout_mode": context.layout_mode,
-                "user_preferences": list(context.user_preferences),
-                "max_components": config.max_components,
-                "allow_optional": config.allow_optional,
-                "preferred_components": list(config.preferred_components),
-            },
-            ensure_ascii=False,
-            sort_keys=True,
+        return (
+            route,
+            self._manifest_fingerprint(manifest),
+            context.raw_query,
+            context.layout_mode,
+            context.user_preferences,
+            config.max_components,
+            config.allow_optional,
+            config.preferred_components,
         )
 
-    @staticmethod
-    def _manifest_fingerprint(manifest: RouteAdapterManifest) -> str:
-        """
-        生成 manifest 的指纹（用于缓存键）。
-
-        Args:
-            manifest: 组件清单
-
-        Returns:
-            manifest 的 JSON 字符串表示
-        """
-        return json.dumps(
-            {
-                "notes": manifest.notes,
-                "components": [
-                    {
-                        "component_id": entry.component_id,
-                        "description": entry.description,
-                        "cost": entry.cost,
-                        "default_selected": entry.default_selected,
-                        "required": entry.required,
-                        "hints": entry.hints,
-                        "field_requirements": entry.field_requirements,
-                    }
-                    for entry in manifest.components
-                ],
-            },
-            ensure_ascii=False,
-            sort_keys=True,
-        )
+    def _get_cached(self, key: Tuple[Hashable, ...]) -> Optional[PlannerDecision]:
+        """查询缓存，命中时标记为最近使用；精确未命中时查询语义缓存。"""
+        with self._cache_lock:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+                return decision
+
+        decision = self._semantic_lookup(key)
+        if decision is not None:
+            # 回填精确缓存，同一措辞再次查询时无需计算向量
+            with self._cache_lock:
+                self._cache[key] = decision
+                self._cache.move_to_end(key)
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return decision
 
-    def _store_cache(self, key: str, decision: PlannerDecision) -> None:
+    def _store_cache(self, key: Tuple[Hashable, ...], decision: PlannerDecision) -> None:
         """
         存储缓存决策（LRU 淘汰策略）。
 
-        策略说明：
-            - 如果键已存在，先删除再插入（实现 LRU：最近使用的移到最后）
-            - 超过容量时淘汰最早的条目（Python 3.7+ dict 保持插入顺序）
+        写入后移到末尾（最近使用），超过容量时淘汰最早的条目，均为 O(1)。
+        配置了向量模型时同时写入语义缓存。
 
         Args:
             key: 缓存键
             decision: 规划决策
         """
-        # 如果键已存在，先删除（实现 LRU：最近使用的移到最后）
-        if key in self._cache:
-            self._cache.pop(key)
+        with self._cache_lock:
+            self._cache[key] = decision
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        self._semantic_store(key, decision)
 
-        # 插入新决策
-        self._cache[key] = decision
+    @staticmethod
+    def _semantic_group(key: Tuple[Hashable, ...]) -> Tuple[Hashable, ...]:
+        """语义缓存分组键：去掉 raw_query，只有其余条件完全一致的决策才可复用。"""
+        return key[:2] + key[3:]
 
-        # 超过容量时淘汰最早的条目
-        if len(self._cache) > self._cache_size:
-            oldest_key = next(iter(self._cache))
-            self._cache.pop(oldest_key)
+    def _semantic_lookup(self, key: Tuple[Hashable, ...]) -> Optional[PlannerDecision]:
+        """在同组决策中查找与当前查询余弦相似度最高且超过阈值的一条。"""
+        if self._embedding_model is None or not key[2]:
+            return None
+        with self._cache_lock:
+            group = self._semantic_cache.get(self._semantic_group(key))
+        if group is None:
+            return None
+        vectors, decisions = group
+        import numpy as np
+
+        scores = vectors @ self._embed_query(key[2])
+        best = int(np.argmax(scores))
+        if scores[best] < self._semantic_threshold:
+            return None
+        return decisions[best]
+
+    def _semantic_store(self, key: Tuple[Hashable, ...], decision: PlannerDecision) -> None:
+        """将决策写入语义缓存（每组与分组数均按 cache_size 淘汰最早的条目）。"""
+        if self._embedding_model is None or not key[2]:
+            return
+        import numpy as np
+
+        group_key = self._semantic_group(key)
+        vector = self._embed_query(key[2])[np.newaxis, :]
+        with self._cache_lock:
+            group = self._semantic_cache.get(group_key)
+            if group is None:
+                vectors, decisions = vector, [decision]
+            else:
+                vectors = np.vstack((group[0], vector))[-self._cache_size :]
+                decisions = (group[1] + [decision])[-self._cache_size :]
+            self._semantic_cache[group_key] = (vectors, decisions)
+            self._semantic_cache.move_to_end(group_key)
+            if len(self._semantic_cache) > self._cache_size:
+                self._semantic_cache.popitem(last=False)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """计算查询的归一化向量（按文本缓存，查询与写入共用一次编码）。"""
+        with self._cache_lock:
+            vector = self._query_vectors.get(query)
+        if vector is not None:
+            return vector
+        import numpy as np
+
+        vector = np.asarray(self._embedding_model.encode([query]), dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector = vector / norm
+        with self._cache_lock:
+            self._query_vectors[query] = vector
+            if len(self._query_vectors) > self._cache_size:
+                self._query_vectors.popitem(last=False)
+        return vector
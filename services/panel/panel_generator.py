@@ -13,7 +13,7 @@ from services.panel.data_block_builder import BlockBuildResult, DataBlockBuilder
 from services.panel.layout_engine import LayoutEngine
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PanelBlockInput:
     block_id: str
     records: Sequence[Any]
@@ -25,7 +25,7 @@ class PanelBlockInput:
     requested_components: Optional[Sequence[str]] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PanelGenerationResult:
     payload: PanelPayload
     data_blocks: Dict[str, Any]
@@ -55,50 +55,60 @@ class PanelGenerator:
         debug_info: Dict[str, Any] = {"blocks": []}
         layout_hints: Dict[str, LayoutHint] = {}
 
+        append_ui_block = ui_blocks.append
+        append_block_debug = debug_info["blocks"].append
+        set_confidence = component_confidence.__setitem__
+        set_layout_hint = layout_hints.__setitem__
+
         for block_index, block_input in enumerate(block_inputs, start=1):
             result = self._build_data_block(block_input)
             data_block = result.data_block
             data_blocks[data_block.id] = data_block
-
-            plans = list(result.block_plans)
-            block_debug: Dict[str, Any] = {
-                "data_block_id": data_block.id,
-                "planned_components": [plan.component_id for plan in plans],
+            # 同一数据块派生的所有 UI 块（含子组件）共享同一份内联数据，schema 只导出一次
+            data_payload = {
+                "items": data_block.records,
+                "schema": data_block.schema_dump(),
+                "stats": data_block.stats,
             }
 
+            # 只读遍历，已是 list 时无需复制
+            plans = result.block_plans
+            if not isinstance(plans, list):
+                plans = list(plans)
+            block_debug: Dict[str, Any] = {"data_block_id": data_block.id}
+
             # 检查是否使用了默认适配器
             if data_block.stats.get("using_default_adapter"):
                 block_debug["using_default_adapter"] = True
                 block_debug["adapter_warning"] = data_block.stats.get("warning")
 
             if not plans:
-                # 情况1: 明确请求了组件但适配器未返回任何计划（提前返回）
+                block_debug["using_fallback"] = True
                 if block_input.requested_components is not None:
-                    block_debug["using_fallback"] = True
+                    # 情况1: 明确请求了组件但适配器未返回任何计划（提前返回）
                     block_debug["fallback_reason"] = (
                         "Adapter returned no block_plans for requested components"
                     )
                     block_debug["requested_components"] = list(block_input.requested_components or [])
-                    plans = [self._build_fallback_plan(block_input, data_block)]
                 else:
                     # 情况2: 未指定 requested_components，使用兜底渲染
-                    block_debug["using_fallback"] = True
                     block_debug["fallback_reason"] = (
                         "Adapter returned no block_plans and no requested_components specified"
                     )
-                    plans = [self._build_fallback_plan(block_input, data_block)]
+                plans = [self._build_fallback_plan(block_input, data_block)]
 
             for plan_index, plan in enumerate(plans, start=1):
                 safe_component = plan.component_id.lower()
                 block_id = f"{data_block.id}-{safe_component}-{plan_index}"
-                ui_block = self._plan_to_ui_block(block_id, data_block, plan)
-                ui_blocks.append(ui_block)
-                component_confidence[block_id] = plan.confidence
+                ui_block = self._plan_to_ui_block(block_id, data_block.id, data_payload, plan)
+                append_ui_block(ui_block)
+                set_confidence(block_id, plan.confidence)
                 if plan.layout_hint:
-                    layout_hints[ui_block.id] = plan.layout_hint
+                    set_layout_hint(ui_block.id, plan.layout_hint)
 
+            # 兜底计划确定后只计算一次
             block_debug["planned_components"] = [plan.component_id for plan in plans]
-            debug_info["blocks"].append(block_debug)
+            append_block_debug(block_debug)
 
         layout: LayoutTree = self.layout_engine.build(
             mode=mode,
@@ -130,7 +140,8 @@ class PanelGenerator:
     def _plan_to_ui_block(
         self,
         block_id: str,
-        data_block: Any,
+        data_ref: str,
+        data_payload: Dict[str, Any],
         plan: AdapterBlockPlan,
     ) -> UIBlock:
         options = dict(plan.options)
@@ -145,18 +156,14 @@ class PanelGenerator:
             children_blocks = []
             for child_index, child_plan in enumerate(plan.children, start=1):
                 child_id = f"{block_id}-child-{child_index}-{child_plan.component_id.lower()}"
-                child_block = self._plan_to_ui_block(child_id, data_block, child_plan)
+                child_block = self._plan_to_ui_block(child_id, data_ref, data_payload, child_plan)
                 children_blocks.append(child_block)
 
         return UIBlock(
             id=block_id,
             component=plan.component_id,
-            data_ref=data_block.id,
-            data={
-                "items": data_block.records,
-                "schema": data_block.schema_summary.model_dump(),
-                "stats": data_block.stats,
-            },
+            data_ref=data_ref,
+            data=data_payload,
             props=plan.props,
             options=options,
             interactions=plan.interactions,
@@ -167,9 +174,9 @@ class PanelGenerator:
 
     def _build_fallback_plan(self, block_input: PanelBlockInput, data_block: Any) -> AdapterBlockPlan:
         title_field = "title"
-        if data_block.records:
-            first_record = data_block.records[0]
-            title_field = next(iter(first_record.keys()), "title")
+        records = data_block.records  # DataBlock 校验后已是 list，直接索引
+        if records:
+            title_field = next(iter(records[0]), "title")
 
         return AdapterBlockPlan(
             component_id="FallbackRichText",
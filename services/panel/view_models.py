@@ -4,9 +4,9 @@ Contract-first Pydantic models for panel component view models.
 
 from __future__ import annotations
 
-from typing import List, Optional, Dict, Any, Sequence
+from typing import Any, Dict, List, Literal, Optional, Sequence
 
-from pydantic import BaseModel, Field, ValidationError, ConfigDict
+from pydantic import BaseModel, Field, ValidationError, ConfigDict, TypeAdapter
 
 
 class ListPanelRecord(BaseModel):
@@ -34,10 +34,9 @@ class StatisticCardRecord(BaseModel):
     metric_delta_value: Optional[float] = Field(
         None, description="Raw numeric delta for downstream calculations"
     )
-    metric_trend: Optional[str] = Field(
+    metric_trend: Optional[Literal["up", "down", "flat"]] = Field(
         None,
         description="Semantic trend indicator used by the frontend to decide colours/icons",
-        pattern="^(up|down|flat)$",
     )
     description: Optional[str] = Field(None, description="Optional supporting text shown under the value")
 
@@ -58,12 +57,12 @@ class NumberViewRecord(BaseModel):
 class TableColumn(BaseModel):
     key: str = Field(..., description="Field key inside record")
     label: str = Field(..., description="Column title")
-    type: Optional[str] = Field(
-        None, description="Value type", pattern="^(text|number|date|currency|tag)$"
+    type: Optional[Literal["text", "number", "date", "currency", "tag"]] = Field(
+        None, description="Value type"
     )
     sortable: bool = Field(default=False, description="Sortable flag")
-    align: Optional[str] = Field(
-        None, description="Alignment", pattern="^(left|center|right)$"
+    align: Optional[Literal["left", "center", "right"]] = Field(
+        None, description="Alignment"
     )
     width: Optional[float] = Field(
         None, ge=0.0, le=1.0, description="Relative width between 0 and 1"
@@ -124,23 +123,23 @@ class FallbackRecord(BaseModel):
 
 
 def ensure_list_panel(records: Sequence[Dict[str, Any]]) -> List[ListPanelRecord]:
-    return [ListPanelRecord.model_validate(record) for record in records]
+    return _LIST_PANEL_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_line_chart(records: Sequence[Dict[str, Any]]) -> List[LineChartRecord]:
-    return [LineChartRecord.model_validate(record) for record in records]
+    return _LINE_CHART_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_bar_chart(records: Sequence[Dict[str, Any]]) -> List[BarChartRecord]:
-    return [BarChartRecord.model_validate(record) for record in records]
+    return _BAR_CHART_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_pie_chart(records: Sequence[Dict[str, Any]]) -> List[PieChartRecord]:
-    return [PieChartRecord.model_validate(record) for record in records]
+    return _PIE_CHART_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_image_gallery(records: Sequence[Dict[str, Any]]) -> List[ImageGalleryRecord]:
-    return [ImageGalleryRecord.model_validate(record) for record in records]
+    return _IMAGE_GALLERY_ADAPTER.validate_python(_as_list(records))
 
 
 class MediaCardRecord(BaseModel):
@@ -160,19 +159,20 @@ class MediaCardRecord(BaseModel):
 
 
 def ensure_media_cards(records: Sequence[Dict[str, Any]]) -> List[MediaCardRecord]:
-    return [MediaCardRecord.model_validate(record) for record in records]
+    return _MEDIA_CARD_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_number_view(records: Sequence[Dict[str, Any]]) -> List[NumberViewRecord]:
-    return [NumberViewRecord.model_validate(record) for record in records]
+    return _NUMBER_VIEW_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_statistic_card(records: Sequence[Dict[str, Any]]) -> List[StatisticCardRecord]:
-    return [StatisticCardRecord.model_validate(record) for record in records]
+    return _STATISTIC_CARD_ADAPTER.validate_python(_as_list(records))
 
 
 def ensure_table_view(model: TableViewModel) -> TableViewModel:
-    return TableViewModel.model_validate(model.model_dump())
+    # 实例构造时已通过校验，浅拷贝即可，无需 dump 再重新 validate
+    return model.model_copy()
 
 
 def ensure_table(records: Sequence[Dict[str, Any]]) -> List[TableViewModel]:
@@ -190,7 +190,7 @@ def ensure_table(records: Sequence[Dict[str, Any]]) -> List[TableViewModel]:
 
 
 def ensure_fallback(records: Sequence[Dict[str, Any]]) -> List[FallbackRecord]:
-    return [FallbackRecord.model_validate(record) for record in records]
+    return _FALLBACK_ADAPTER.validate_python(_as_list(records))
 
 
 class ContractViolation(ValueError):
@@ -203,30 +203,51 @@ class ContractViolation(ValueError):
         super().__init__(message)
 
 
+# 每个模型的 List[Model] 适配器：整批记录一次性交给 pydantic-core 校验/导出
+_LIST_PANEL_ADAPTER = TypeAdapter(List[ListPanelRecord])
+_STATISTIC_CARD_ADAPTER = TypeAdapter(List[StatisticCardRecord])
+_NUMBER_VIEW_ADAPTER = TypeAdapter(List[NumberViewRecord])
+_TABLE_ADAPTER = TypeAdapter(List[TableViewModel])
+_LINE_CHART_ADAPTER = TypeAdapter(List[LineChartRecord])
+_BAR_CHART_ADAPTER = TypeAdapter(List[BarChartRecord])
+_PIE_CHART_ADAPTER = TypeAdapter(List[PieChartRecord])
+_IMAGE_GALLERY_ADAPTER = TypeAdapter(List[ImageGalleryRecord])
+_MEDIA_CARD_ADAPTER = TypeAdapter(List[MediaCardRecord])
+_FALLBACK_ADAPTER = TypeAdapter(List[FallbackRecord])
+
+# component_id -> List[Model] 适配器
+_DISPATCH: Dict[str, TypeAdapter] = {
+    "MediaCardGrid": _MEDIA_CARD_ADAPTER,
+    "ListPanel": _LIST_PANEL_ADAPTER,
+    "LineChart": _LINE_CHART_ADAPTER,
+    "BarChart": _BAR_CHART_ADAPTER,
+    "PieChart": _PIE_CHART_ADAPTER,
+    "ImageGallery": _IMAGE_GALLERY_ADAPTER,
+    "StatisticCard": _STATISTIC_CARD_ADAPTER,
+    "NumberView": _NUMBER_VIEW_ADAPTER,
+    "Table": _TABLE_ADAPTER,
+    "FallbackRichText": _FALLBACK_ADAPTER,
+}
+
+
+def _as_list(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return records if isinstance(records, list) else list(records)
+
+
 def validate_records(component_id: str, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    adapter = _DISPATCH.get(component_id)
+    if adapter is None:
+        # Unknown component: return records without validation.
+        return list(records)
+
+    if component_id == "Table":
+        # 与 ensure_table 一致：Table 只取第一个 TableViewModel
+        records = records[:1]
+
+    records = _as_list(records)
     try:
-        if component_id == "MediaCardGrid":
-            return [model.model_dump() for model in ensure_media_cards(records)]
-        if component_id == "ListPanel":
-            return [model.model_dump() for model in ensure_list_panel(records)]
-        if component_id == "LineChart":
-            return [model.model_dump() for model in ensure_line_chart(records)]
-        if component_id == "BarChart":
-            return [model.model_dump() for model in ensure_bar_chart(records)]
-        if component_id == "PieChart":
-            return [model.model_dump() for model in ensure_pie_chart(records)]
-        if component_id == "ImageGallery":
-            return [model.model_dump() for model in ensure_image_gallery(records)]
-        if component_id == "StatisticCard":
-            return [model.model_dump() for model in ensure_statistic_card(records)]
-        if component_id == "NumberView":
-            return [model.model_dump() for model in ensure_number_view(records)]
-        if component_id == "Table":
-            return [model.model_dump() for model in ensure_table(records)]
-        if component_id == "FallbackRichText":
-            return [model.model_dump() for model in ensure_fallback(records)]
+        models = adapter.validate_python(records)
     except ValidationError as exc:
         raise ContractViolation(component_id, exc) from exc
 
-    # Unknown component: return records without validation.
-    return list(records)
+    return adapter.dump_python(models)
@@ -3,18 +3,45 @@
 并行执行多个 RAG 查询，提高复杂研究的效率
 """
 
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, replace
+
+import numpy as np
 
 from services.llm_query_planner import SubQuery
 from services.data_query_service import DataQueryService, DataQueryResult
+from services.thread_pools import get_pool
 
 logger = logging.getLogger(__name__)
 
+# 环境变量覆盖默认并行度，如 OMNIBOX_PARALLEL_WORKERS=8
+PARALLEL_WORKERS_ENV = "OMNIBOX_PARALLEL_WORKERS"
+_MAX_DEFAULT_WORKERS = 32
+
+
+def default_max_workers() -> int:
+    """
+    默认并行度：子查询以网络 IO（RAG、LLM、RSSHub）为主，取 2 倍 CPU 核数，
+    下限 4、上限 32；设置了 OMNIBOX_PARALLEL_WORKERS 时以其为准。
+    """
+    override = os.getenv(PARALLEL_WORKERS_ENV)
+    if override:
+        try:
+            return max(1, int(override))
+        except ValueError:
+            logger.warning("%s 不是有效整数，忽略: %r", PARALLEL_WORKERS_ENV, override)
+    return min(_MAX_DEFAULT_WORKERS, max(4, 2 * (os.cpu_count() or 2)))
+
 
-@dataclass
+@dataclass(slots=True)
 class SubQueryResult:
     """子查询执行结果"""
     sub_query: SubQuery
@@ -23,6 +50,155 @@ class SubQueryResult:
     execution_time: float = 0.0  # 执行耗时（秒）
 
 
+@dataclass(frozen=True, slots=True)
+class _CachedQuery:
+    """语义缓存条目：查询结果及其数据来源（用于来源校验与失效）。"""
+    result: DataQueryResult
+    route_ids: FrozenSet[str]  # 结果各数据集的 route_id
+    paths: Tuple[str, ...]  # 结果各数据集的 generated_path
+
+
+class SemanticQueryCache:
+    """
+    子查询语义结果缓存
+
+    LLM 规划器常为不同研究会话生成措辞相近的子查询，命中时可跳过整个
+    RAG 检索 + LLM 解析 + 数据拉取流程。为避免把近义但数据源不同的查询
+    混为一谈，命中需同时满足：
+    1. 同一分组（数据源过滤、单路模式、用户一致）内查询向量余弦相似度 >= threshold
+    2. 提供 source_resolver 时，新查询检索到的 route_id 与缓存结果来源的
+       Jaccard 重合度 >= min_source_overlap
+    3. 条目未被 invalidate(source_prefix) 失效（数据源更新时由调用方触发）
+
+    线程安全：ParallelQueryExecutor 在线程池中并发查询/写入。
+    """
+
+    def __init__(
+        self,
+        embedding_model: Any,
+        threshold: float = 0.92,
+        maxsize: int = 128,
+        source_resolver: Optional[Callable[[str], Sequence[str]]] = None,
+        min_source_overlap: float = 0.5,
+    ):
+        """
+        Args:
+            embedding_model: 向量模型（需提供 encode(texts) -> ndarray，如 rag_system.EmbeddingModel）
+            threshold: 命中所需的最小余弦相似度
+            maxsize: 每个分组与分组数的容量上限（LRU 淘汰）
+            source_resolver: 查询 -> 检索到的 route_id 列表（如 RAGPipeline.search 的轻量封装）；
+                为 None 时跳过来源重合度校验
+            min_source_overlap: 来源 Jaccard 重合度下限
+        """
+        self._embedding_model = embedding_model
+        self._threshold = threshold
+        self._maxsize = maxsize
+        self._source_resolver = source_resolver
+        self._min_source_overlap = min_source_overlap
+        self._lock = threading.Lock()
+        # 分组键 -> (归一化查询向量矩阵, 对应条目)
+        self._groups: OrderedDict[
+            Tuple[Hashable, ...], Tuple[np.ndarray, List[_CachedQuery]]
+        ] = OrderedDict()
+
+    def lookup(self, query: str, group: Tuple[Hashable, ...]) -> Optional[DataQueryResult]:
+        """查找可复用的结果；未命中或来源校验不通过时返回 None。"""
+        if not query:
+            return None
+        with self._lock:
+            entry = self._groups.get(group)
+        if entry is None:
+            return None
+
+        vectors, cached = entry
+        scores = vectors @ self._embed(query)
+        best = int(np.argmax(scores))
+        if scores[best] < self._threshold:
+            return None
+
+        candidate = cached[best]
+        if self._source_resolver is not None and candidate.route_ids:
+            retrieved = frozenset(self._source_resolver(query))
+            union = retrieved | candidate.route_ids
+            overlap = len(retrieved & candidate.route_ids) / len(union) if union else 0.0
+            if overlap < self._min_source_overlap:
+                return None
+
+        with self._lock:
+            if group in self._groups:
+                self._groups.move_to_end(group)
+        return candidate.result
+
+    def store(self, query: str, group: Tuple[Hashable, ...], result: DataQueryResult) -> None:
+        """写入成功的查询结果。"""
+        if not query:
+            return
+        datasets = result.datasets
+        cached = _CachedQuery(
+            result=result,
+            route_ids=frozenset(dataset.route_id for dataset in datasets if dataset.route_id),
+            paths=tuple(
+                path
+                for path in [result.generated_path, *(dataset.generated_path for dataset in datasets)]
+                if path
+            ),
+        )
+        vector = self._embed(query)[np.newaxis, :]
+        with self._lock:
+            entry = self._groups.get(group)
+            if entry is None:
+                vectors, entries = vector, [cached]
+            else:
+                vectors = np.vstack((entry[0], vector))[-self._maxsize :]
+                entries = (entry[1] + [cached])[-self._maxsize :]
+            self._groups[group] = (vectors, entries)
+            self._groups.move_to_end(group)
+            if len(self._groups) > self._maxsize:
+                self._groups.popitem(last=False)
+
+    def invalidate(self, source_prefix: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            source_prefix: route_id 或 generated_path 前缀（如 "bilibili" 或 "/bilibili/hot-search"）；
+                为 None 时清空全部
+
+        Returns:
+            被移除的条目数
+        """
+        with self._lock:
+            if source_prefix is None:
+                removed = sum(len(entries) for _, entries in self._groups.values())
+                self._groups.clear()
+                return removed
+
+            removed = 0
+            for group, (vectors, entries) in list(self._groups.items()):
+                keep = [
+                    index
+                    for index, cached in enumerate(entries)
+                    if not any(
+                        source.startswith(source_prefix)
+                        for source in (*cached.route_ids, *cached.paths)
+                    )
+                ]
+                if len(keep) == len(entries):
+                    continue
+                removed += len(entries) - len(keep)
+                if keep:
+                    self._groups[group] = (vectors[keep], [entries[index] for index in keep])
+                else:
+                    del self._groups[group]
+            return removed
+
+    def _embed(self, query: str) -> np.ndarray:
+        """计算查询的归一化向量。"""
+        vector = np.asarray(self._embedding_model.encode([query]), dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
 class ParallelQueryExecutor:
     """
     并行查询执行器
@@ -36,24 +212,33 @@ class ParallelQueryExecutor:
     def __init__(
         self,
         data_query_service: DataQueryService,
-        max_workers: int = 3,
+        max_workers: Optional[int] = None,
         timeout_per_query: int = 30,
+        semantic_cache: Optional[SemanticQueryCache] = None,
+        executor: Optional[Executor] = None,
     ):
         """
         初始化并行查询执行器
 
         Args:
             data_query_service: 数据查询服务实例
-            max_workers: 最大并行数（默认 3）
+            max_workers: 最大并行数（默认见 default_max_workers()；线程按需创建，
+                子查询数少于该值时不会启动多余线程）
             timeout_per_query: 每个查询的超时时间（秒，默认 30）
+            semantic_cache: 子查询语义结果缓存（可选，仅在 use_cache=True 时生效）
+            executor: 执行子查询的线程池（可选）；默认绑定进程级共享池 "rag_query"，
+                其大小由首次创建时的 max_workers 决定
         """
+        if max_workers is None:
+            max_workers = default_max_workers()
         self.data_query_service = data_query_service
-        self.max_workers = max_workers
         self.timeout_per_query = timeout_per_query
-        self.executor = ThreadPoolExecutor(
-            max_workers=max_workers,
-            thread_name_prefix="parallel-query"
-        )
+        self.semantic_cache = semantic_cache
+        # 线程池为共享池或外部注入，生命周期不归本实例管理
+        self.executor = executor if executor is not None else get_pool("rag_query", max_workers)
+        # 共享池可能由先创建的实例以其他大小创建：并行度（超时轮数、异步信号量）以池的实际大小为准
+        max_workers = getattr(self.executor, "_max_workers", max_workers)
+        self.max_workers = max_workers
         logger.info(
             "ParallelQueryExecutor 初始化完成 (max_workers=%d, timeout=%ds)",
             max_workers,
@@ -90,7 +275,11 @@ class ParallelQueryExecutor:
             user_id,
         )
 
-        # 提交所有任务
+        requested = sub_queries
+        sub_queries, slots = self._dedupe(requested)
+        embeddings = self._pre_embed(sub_queries, use_cache)
+
+        # 提交所有任务（记录提交下标，完成时直接写回对应位置）
         futures = {}
         for idx, sub_query in enumerate(sub_queries):
             future = self.executor.submit(
@@ -100,61 +289,239 @@ class ParallelQueryExecutor:
                 idx,
                 prefer_single_route,
                 user_id,  # Phase 2: 传递 user_id
+                embeddings[idx],
             )
-            futures[future] = sub_query
-
-        # 收集结果
-        results = []
-        for future in as_completed(futures, timeout=self.timeout_per_query * 2):
-            sub_query = futures[future]
-            try:
-                result = future.result(timeout=self.timeout_per_query)
-                results.append(result)
-
-                if result.error:
-                    logger.warning(
-                        "子查询失败: %s - %s",
-                        result.sub_query.query,
-                        result.error
-                    )
-                else:
-                    logger.info(
-                        "子查询成功: %s (耗时 %.2fs, %d 条数据)",
-                        result.sub_query.query,
-                        result.execution_time,
-                        len(result.result.items) if result.result else 0
+            futures[future] = idx
+
+        # 收集结果：按下标写入预分配列表，天然保持原始顺序，查询文本重复也不会互相覆盖
+        # （截止后未完成的会在下方补为超时结果，返回时每个位置都已填充）
+        results: List[SubQueryResult] = [None] * len(sub_queries)  # type: ignore[list-item]
+        # 统一截止时间：线程池每轮最多并行 max_workers 个子查询，每轮给足单个子查询的超时
+        waves = -(-len(sub_queries) // max(1, self.max_workers))
+        deadline = time.monotonic() + self.timeout_per_query * waves
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = futures[future]
+                sub_query = sub_queries[idx]
+                try:
+                    result = future.result()
+                    results[idx] = result
+                    self._log_result(result)
+
+                except Exception as exc:
+                    logger.error(f"子查询异常: {sub_query.query} - {exc}", exc_info=True)
+                    results[idx] = SubQueryResult(
+                        sub_query=sub_query,
+                        result=None,
+                        error=str(exc)
                     )
 
-            except TimeoutError:
+        # 截止时仍未完成的子查询：尚未开始的直接取消，统一记为超时
+        for future in pending:
+            future.cancel()
+            sub_query = sub_queries[futures[future]]
+            logger.error(f"子查询超时: {sub_query.query}")
+            results[futures[future]] = SubQueryResult(
+                sub_query=sub_query,
+                result=None,
+                error=f"查询超时（>{self.timeout_per_query}秒）"
+            )
+
+        results = self._fan_out(requested, results, slots)
+        self._log_summary(results)
+        return results
+
+    async def execute_parallel_async(
+        self,
+        sub_queries: List[SubQuery],
+        use_cache: bool = True,
+        prefer_single_route: bool = False,
+        user_id: Optional[int] = None,
+    ) -> List[SubQueryResult]:
+        """
+        异步并行执行多个子查询（供事件循环内的调用方使用）
+
+        子查询在执行器线程池中运行，由事件循环统一等待：
+        - 同时运行的子查询数不超过 max_workers（信号量控制，排队时间不计入超时）
+        - 每个子查询单独应用 timeout_per_query 超时
+        - asyncio.gather 按提交顺序返回，结果顺序与 sub_queries 一致
+
+        参数与返回值同 execute_parallel。
+        """
+        if not sub_queries:
+            logger.warning("子查询列表为空，无需执行")
+            return []
+
+        logger.info(
+            "开始异步并行执行 %d 个子查询 (prefer_single_route=%s, user_id=%s)",
+            len(sub_queries),
+            prefer_single_route,
+            user_id,
+        )
+
+        requested = sub_queries
+        sub_queries, slots = self._dedupe(requested)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_workers)
+        embeddings = await loop.run_in_executor(
+            self.executor, self._pre_embed, sub_queries, use_cache
+        )
+
+        async def run(idx: int, sub_query: SubQuery) -> SubQueryResult:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self.executor,
+                        partial(
+                            self._execute_single_query,
+                            sub_query,
+                            use_cache,
+                            idx,
+                            prefer_single_route,
+                            user_id,
+                            embeddings[idx],
+                        ),
+                    ),
+                    timeout=self.timeout_per_query,
+                )
+
+        outcomes = await asyncio.gather(
+            *(run(idx, sub_query) for idx, sub_query in enumerate(sub_queries)),
+            return_exceptions=True,
+        )
+
+        results: List[SubQueryResult] = []
+        for sub_query, outcome in zip(sub_queries, outcomes):
+            if isinstance(outcome, SubQueryResult):
+                result = outcome
+                self._log_result(result)
+            elif isinstance(outcome, asyncio.TimeoutError):
                 logger.error(f"子查询超时: {sub_query.query}")
-                results.append(SubQueryResult(
+                result = SubQueryResult(
                     sub_query=sub_query,
                     result=None,
                     error=f"查询超时（>{self.timeout_per_query}秒）"
-                ))
-
-            except Exception as exc:
-                logger.error(f"子查询异常: {sub_query.query} - {exc}", exc_info=True)
-                results.append(SubQueryResult(
+                )
+            else:
+                logger.error(f"子查询异常: {sub_query.query} - {outcome}", exc_info=outcome)
+                result = SubQueryResult(
                     sub_query=sub_query,
                     result=None,
-                    error=str(exc)
-                ))
-
-        # 按原始顺序排序结果
-        results_map = {r.sub_query.query: r for r in results}
-        sorted_results = [
-            results_map.get(sq.query, SubQueryResult(
-                sub_query=sq,
-                result=None,
-                error="未执行"
-            ))
-            for sq in sub_queries
+                    error=str(outcome)
+                )
+            results.append(result)
+
+        results = self._fan_out(requested, results, slots)
+        self._log_summary(results)
+        return results
+
+    @staticmethod
+    def _dedupe(sub_queries: List[SubQuery]) -> Tuple[List[SubQuery], List[int]]:
+        """
+        合并 (query, datasource) 相同的子查询，每组只派发一次
+
+        Returns:
+            (unique, slots)：unique 为去重后的子查询（保持首次出现顺序），
+            slots[i] 为 sub_queries[i] 在 unique 中的下标
+        """
+        positions: Dict[Tuple[str, Optional[str]], int] = {}
+        unique: List[SubQuery] = []
+        slots: List[int] = []
+        for sub_query in sub_queries:
+            key = (sub_query.query, sub_query.datasource)
+            pos = positions.get(key)
+            if pos is None:
+                pos = positions[key] = len(unique)
+                unique.append(sub_query)
+            slots.append(pos)
+
+        if len(unique) < len(sub_queries):
+            logger.info("合并 %d 个重复子查询", len(sub_queries) - len(unique))
+        return unique, slots
+
+    @staticmethod
+    def _fan_out(
+        sub_queries: List[SubQuery],
+        unique_results: List[SubQueryResult],
+        slots: List[int],
+    ) -> List[SubQueryResult]:
+        """
+        把去重后的结果按 slots 回填到每个原始子查询的位置
+
+        重复位置得到 DataQueryResult 的浅拷贝（items/datasets 列表也复制一层），
+        调用方增删某个结果的字段或条目不会影响其他位置；条目字典本身仍共享，应视为只读。
+        """
+        if len(unique_results) == len(sub_queries):
+            return unique_results
+        results: List[SubQueryResult] = []
+        for sub_query, slot in zip(sub_queries, slots):
+            result = unique_results[slot]
+            if result.sub_query is not sub_query:
+                data = result.result
+                if data is not None:
+                    data = replace(data, items=list(data.items), datasets=list(data.datasets))
+                result = replace(result, sub_query=sub_query, result=data)
+            results.append(result)
+        return results
+
+    def _pre_embed(self, sub_queries: List[SubQuery], use_cache: bool = True) -> List[Optional[Any]]:
+        """
+        派发前一次性批量计算 RAG 缓存未命中的子查询的向量
+
+        批量编码的耗时远低于逐条编码之和；RAG 缓存命中的子查询不会用到向量，
+        不参与编码。不支持批量编码、待编码的子查询少于两个或编码失败时对应位置
+        为 None，由各子查询在 RAG 检索时自行编码。
+        """
+        result: List[Optional[Any]] = [None] * len(sub_queries)
+        embed = getattr(self.data_query_service, "embed_queries", None)
+        if embed is None or len(sub_queries) < 2:
+            return result
+        is_cached = getattr(self.data_query_service, "is_rag_cached", None) if use_cache else None
+        pending = [
+            index
+            for index, sub_query in enumerate(sub_queries)
+            if is_cached is None or not is_cached(sub_query.query, sub_query.datasource)
         ]
+        if len(pending) < 2:
+            return result
+        try:
+            embeddings = embed([sub_queries[index].query for index in pending])
+        except Exception as exc:
+            logger.warning("子查询批量向量化失败，改为逐条编码: %s", exc)
+            return result
+        if embeddings is None or len(embeddings) != len(pending):
+            return result
+        for index, embedding in zip(pending, embeddings):
+            result[index] = embedding
+        return result
+
+    @staticmethod
+    def _log_result(result: SubQueryResult) -> None:
+        """记录单个子查询的执行结果"""
+        if result.error:
+            logger.warning(
+                "子查询失败: %s - %s",
+                result.sub_query.query,
+                result.error
+            )
+        else:
+            logger.info(
+                "子查询成功: %s (耗时 %.2fs, %d 条数据)",
+                result.sub_query.query,
+                result.execution_time,
+                len(result.result.items) if result.result else 0
+            )
 
-        # 统计
-        success_count = sum(1 for r in sorted_results if r.result and r.result.status == "success")
-        failure_count = len(sorted_results) - success_count
+    @staticmethod
+    def _log_summary(results: List[SubQueryResult]) -> None:
+        """记录本批子查询的成功/失败统计"""
+        success_count = sum(1 for r in results if r.result and r.result.status == "success")
+        failure_count = len(results) - success_count
 
         logger.info(
             "并行执行完成: 成功 %d 个，失败 %d 个",
@@ -162,8 +529,6 @@ class ParallelQueryExecutor:
             failure_count
         )
 
-        return sorted_results
-
     def _execute_single_query(
         self,
         sub_query: SubQuery,
@@ -171,6 +536,7 @@ class ParallelQueryExecutor:
         index: int,
         prefer_single_route: bool,
         user_id: Optional[int] = None,  # Phase 2: 用户 ID
+        query_embedding: Optional[Any] = None,
     ) -> SubQueryResult:
         """
         执行单个子查询
@@ -181,24 +547,40 @@ class ParallelQueryExecutor:
             index: 查询索引
             prefer_single_route: 是否优先使用单路模式
             user_id: 用户 ID（Phase 2，游客模式可为 None）
+            query_embedding: 派发前批量计算的查询向量（可选）
 
         Returns:
             SubQueryResult: 执行结果
         """
-        import time
         start_time = time.time()
 
         try:
-            logger.debug(f"[子查询 {index+1}] 开始执行: {sub_query.query}")
-
-            # 调用 DataQueryService
-            result = self.data_query_service.query(
-                user_query=sub_query.query,
-                filter_datasource=sub_query.datasource,
-                use_cache=use_cache,
-                prefer_single_route=prefer_single_route,
-                user_id=user_id,  # Phase 2: 传递 user_id
+            logger.debug("[子查询 %d] 开始执行: %s", index + 1, sub_query.query)
+
+            semantic_cache = self.semantic_cache if use_cache else None
+            cache_group = (sub_query.datasource, prefer_single_route, user_id)
+            result = (
+                semantic_cache.lookup(sub_query.query, cache_group)
+                if semantic_cache is not None
+                else None
             )
+            if result is not None:
+                logger.debug("[子查询 %d] 命中语义缓存: %s", index + 1, sub_query.query)
+            else:
+                # 调用 DataQueryService（仅在有预计算向量时传入，兼容旧实现）
+                extra_kwargs: Dict[str, Any] = {}
+                if query_embedding is not None:
+                    extra_kwargs["query_embedding"] = query_embedding
+                result = self.data_query_service.query(
+                    user_query=sub_query.query,
+                    filter_datasource=sub_query.datasource,
+                    use_cache=use_cache,
+                    prefer_single_route=prefer_single_route,
+                    user_id=user_id,  # Phase 2: 传递 user_id
+                    **extra_kwargs,
+                )
+                if semantic_cache is not None and result.status == "success":
+                    semantic_cache.store(sub_query.query, cache_group, result)
 
             execution_time = time.time() - start_time
 
@@ -233,9 +615,13 @@ class ParallelQueryExecutor:
             )
 
     def shutdown(self):
-        """关闭执行器"""
+        """
+        关闭执行器
+
+        线程池为进程级共享池或由调用方注入，这里不会关闭它，
+        以免影响其他仍在使用该线程池的服务实例。
+        """
         logger.info("关闭 ParallelQueryExecutor")
-        self.executor.shutdown(wait=True)
 
     def __enter__(self):
         return self
@@ -31,6 +31,7 @@ class StreamEventType(str, Enum):
     ERROR = "error"  # 错误事件
     CANCELLED = "cancelled"  # 取消事件
     PANEL_PREVIEW = "panel_preview"  # 数据卡片预览（前端实时展示）
+    BATCH = "batch"  # 合并投递的一组事件（仅在监听队列内部使用，推送前拆开）
 
 
 class StepStatus(str, Enum):
@@ -71,9 +72,15 @@ class DefaultConfig:
     TASK_WAIT_TIMEOUT = 10.0  # 任务等待超时（秒）
     THREAD_POOL_SIZE = 5  # 线程池大小
     HISTORY_LIMIT = 200  # 事件历史限制
+    TOOL_CACHE_SIZE = 64  # 研究工具查询结果缓存条数
+    TOOL_CACHE_TTL = 300  # 研究工具查询结果缓存有效期（秒）
+    CALLBACK_BATCH_SIZE = 8  # 批量回调时单批最多合并的步骤数
+    # 事件合并投递窗口（毫秒）；默认关闭：研究步骤多为秒级 LLM 调用，窗口内很少超过一条事件，
+    # 开启后每个窗口都要新建 Timer 线程并增加窗口时长的延迟，且监听队列会收到 batch 事件
+    EVENT_BATCH_WINDOW_MS = 0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ResearchConfig:
     """
     研究任务配置对象。
@@ -93,6 +100,8 @@ class ResearchConfig:
     callback: Optional[Callable[[Dict[str, Any]], None]] = None
     initial_state: Optional[Dict[str, Any]] = None
     reuse_task: bool = False
+    # 回调合并窗口（毫秒）；0 表示每个步骤单独回调，>0 时窗口内的步骤合并为一次 step_batch 回调
+    callback_flush_ms: int = 0
 
     def __post_init__(self):
         """验证配置参数"""
@@ -132,6 +141,10 @@ class ResearchConfig:
             if not callable(self.callback):
                 raise ValueError("callback 必须是可调用对象")
 
+        # 验证 callback_flush_ms
+        if not 0 <= self.callback_flush_ms <= 1000:
+            raise ValueError(f"callback_flush_ms 必须在 0-1000 之间，当前值：{self.callback_flush_ms}")
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ResearchConfig":
         """从字典创建配置对象"""
@@ -5,20 +5,26 @@
 
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, List, Dict, Any, Callable
+import time
+from concurrent.futures import Executor, Future, wait
+from itertools import islice
+from typing import Optional, List, Dict, Any, Callable, Set
 from dataclasses import dataclass, field
 from datetime import datetime
 from uuid import uuid4
 
+from cachetools import TTLCache
+
 from langgraph_agents.runtime import LangGraphRuntime, ToolExecutionContext
 from langgraph_agents.graph_builder import create_langgraph_app
 from langgraph_agents.storage import InMemoryResearchDataStore
 from langgraph_agents.tools.registry import ToolRegistry, tool
 from langgraph_agents.tools.bootstrap import register_default_tools
 from langgraph_agents.config import LangGraphConfig
-from langgraph_agents.state import ToolCall, ToolExecutionPayload
-from services.research_task_hub import ResearchTaskHub
+from langgraph_agents.state import DataReference, ToolCall, ToolExecutionPayload
+from langgraph_agents.tools.public_data import PUBLIC_DATA_CACHE_KEY
+from services.research_task_hub import ResearchTaskHub, utc_now_iso
+from services.thread_pools import get_pool
 from services.research_constants import (
     StepStatus,
     NodeName,
@@ -31,7 +37,7 @@ from services.research_constants import (
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResearchStep:
     """单个研究步骤记录"""
 
@@ -39,11 +45,17 @@ class ResearchStep:
     node_name: str  # router / planner / tool_executor / reflector / synthesizer
     action: str  # 步骤描述
     status: str  # success / error / in_progress
-    timestamp: str
+    timestamp_ms: int  # 相对研究开始时刻的毫秒偏移（单调时钟）
     details: Optional[Dict[str, Any]] = None
+    started_at: float = 0.0  # 研究开始时的 Unix 时间戳（秒），用于换算墙钟时间
+
+    @property
+    def timestamp(self) -> str:
+        """步骤发生时刻的 ISO 字符串，仅在序列化时按需格式化"""
+        return datetime.fromtimestamp(self.started_at + self.timestamp_ms / 1000).isoformat()
 
 
-@dataclass
+@dataclass(slots=True)
 class ResearchResult:
     """研究结果"""
 
@@ -55,6 +67,85 @@ class ResearchResult:
     error: Optional[str] = None
 
 
+def _describe_router(node_data: Dict[str, Any]) -> str:
+    decision = node_data.get("router_decision")
+    route = decision.get("route", "unknown") if isinstance(decision, dict) else "unknown"
+    return f"路由决策: {route}"
+
+
+def _describe_planner(node_data: Dict[str, Any]) -> str:
+    tool_call = node_data.get("next_tool_call")
+    if tool_call:
+        return f"规划下一步: 调用工具 {tool_call.get('plugin_id', 'unknown')}"
+    return "规划下一步"
+
+
+def _describe_reflector(node_data: Dict[str, Any]) -> str:
+    reflection = node_data.get("reflection")
+    decision = reflection.get("decision", "unknown") if isinstance(reflection, dict) else "unknown"
+    return f"反思决策: {decision}"
+
+
+def _constant_action(description: str) -> Callable[[Dict[str, Any]], str]:
+    return lambda _node_data: description
+
+
+# 节点名称 -> 动作描述函数；每个事件只需一次字典查找，未登记的节点走默认描述
+_ACTION_HANDLERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    NodeName.ROUTER.value: _describe_router,
+    "simple_chat": _constant_action("简单对话响应"),
+    NodeName.PLANNER.value: _describe_planner,
+    NodeName.TOOL_EXECUTOR.value: _constant_action("执行工具调用"),
+    "data_stasher": _constant_action("数据暂存和摘要"),
+    NodeName.REFLECTOR.value: _describe_reflector,
+    NodeName.SYNTHESIZER.value: _constant_action("生成最终报告"),
+    NodeName.WAIT_FOR_HUMAN.value: _constant_action("等待人工介入"),
+}
+
+
+class _CallbackBatcher:
+    """
+    合并短时间内连续产生的步骤回调。
+
+    缓冲满 max_batch 条，或 add 时距上次投递已超过 flush_ms，以
+    {"type": "step_batch", "events": [...]} 一次性投递。投递始终发生在调用
+    add/flush 的研究线程上，不另起线程；因此缓冲中的步骤最迟在下一个步骤到达
+    或研究结束（finally 中调用 flush()）时投递。
+    """
+
+    __slots__ = ("_callback", "_window", "_max_batch", "_buffer", "_last_flush")
+
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        flush_ms: int,
+        max_batch: int = DefaultConfig.CALLBACK_BATCH_SIZE,
+    ):
+        self._callback = callback
+        self._window = flush_ms / 1000
+        self._max_batch = max_batch
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, payload: Dict[str, Any]) -> None:
+        self._buffer.append(payload)
+        if (
+            len(self._buffer) >= self._max_batch
+            or time.monotonic() - self._last_flush >= self._window
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        events, self._buffer = self._buffer, []
+        try:
+            self._callback({"type": "step_batch", "events": events})
+        except Exception as cb_exc:
+            logger.warning("回调函数执行失败: %s", cb_exc)
+
+
 class ResearchService:
     """
     研究服务（封装 LangGraph Agents）。
@@ -73,6 +164,7 @@ class ResearchService:
         synthesizer_llm,
         data_query_service,
         config: Optional[LangGraphConfig] = None,
+        executor: Optional[Executor] = None,
     ):
         """
         初始化研究服务。
@@ -84,6 +176,8 @@ class ResearchService:
             synthesizer_llm: 综合 LLM 客户端
             data_query_service: 数据查询服务（用于工具调用）
             config: LangGraph 配置（可选）
+            executor: 执行任务恢复的线程池（可选）；默认绑定进程级共享池 "llm"，
+                由调用方负责关闭，close() 不会关闭它
         """
         self.data_query_service = data_query_service
         self.config = config or LangGraphConfig.default()
@@ -97,10 +191,17 @@ class ResearchService:
         # 初始化工具注册表
         self.tool_registry = self._init_tools()
 
+        # 工具查询结果缓存：同一 (query, datasource) 在有效期内只查询一次
+        self._tool_cache: TTLCache = TTLCache(
+            maxsize=DefaultConfig.TOOL_CACHE_SIZE,
+            ttl=DefaultConfig.TOOL_CACHE_TTL,
+        )
+
         # 创建工具执行上下文（注入依赖）
         tool_context = ToolExecutionContext(
             data_query_service=data_query_service,
             note_backend=None,  # 暂不支持笔记搜索
+            extras={PUBLIC_DATA_CACHE_KEY: self._tool_cache},
         )
 
         # 初始化 LangGraph 运行时
@@ -116,13 +217,13 @@ class ResearchService:
 
         # 创建 LangGraph 应用
         self.app = create_langgraph_app(self.runtime)
-        self.task_hub = ResearchTaskHub()
+        self.task_hub = ResearchTaskHub(batch_window_ms=DefaultConfig.EVENT_BATCH_WINDOW_MS)
 
-        # 创建线程池用于处理任务恢复（避免手动创建 daemon 线程）
-        self._executor = ThreadPoolExecutor(
-            max_workers=DefaultConfig.THREAD_POOL_SIZE,
-            thread_name_prefix="research-resume",
-        )
+        # 任务恢复跑在进程级共享的 llm 线程池上（避免每个实例各建一个线程池），
+        # 自行记录未完成的恢复任务，close() 时只等待本实例提交的任务
+        self._executor = executor if executor is not None else get_pool("llm", DefaultConfig.THREAD_POOL_SIZE)
+        self._pending_resumes: Set[Future] = set()
+        self._pending_lock = threading.Lock()
 
         logger.info("ResearchService 初始化完成")
 
@@ -172,8 +273,15 @@ class ResearchService:
                 # 标记任务为错误状态
                 self.task_hub.mark_error(task_id, f"任务恢复失败: {str(exc)}")
 
+        with self._pending_lock:
+            self._pending_resumes.add(future)
+        future.add_done_callback(self._discard_pending_resume)
         future.add_done_callback(_handle_resume_result)
 
+    def _discard_pending_resume(self, future: Future) -> None:
+        with self._pending_lock:
+            self._pending_resumes.discard(future)
+
     def cancel_task(self, task_id: str, reason: str = "用户取消") -> None:
         """标记任务已取消。"""
         self.task_hub.cancel_task(task_id, reason)
@@ -194,7 +302,7 @@ class ResearchService:
         # 注册默认工具（fetch_public_data 和 search_private_notes）
         register_default_tools(registry)
 
-        logger.info(f"已注册 {len(registry.list_tools())} 个工具")
+        logger.info("已注册 %d 个工具", len(registry.list_tools()))
         return registry
 
     def research(
@@ -258,7 +366,7 @@ class ResearchService:
             event = {
                 "type": StreamEventType.PANEL_PREVIEW,
                 "task_id": task_identifier,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": utc_now_iso(),
                 "data": payload,
             }
             self.task_hub.publish_event(task_identifier, event)
@@ -271,50 +379,70 @@ class ResearchService:
             base_state.setdefault("original_query", config.user_query)
             base_state.setdefault("chat_history", [])
 
-            thread_id = f"research-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            # 每次研究只取一次墙钟时间，步骤时间戳用单调时钟偏移表示
+            started_at = time.time()
+            started_monotonic = time.monotonic()
+            thread_id = f"research-{datetime.fromtimestamp(started_at).strftime('%Y%m%d%H%M%S')}"
             langgraph_config = {"configurable": {"thread_id": thread_id}}
             self.task_hub.ensure_task(task_identifier, thread_id, config.user_query, config.filter_datasource)
             if config.reuse_task:
                 self.task_hub.mark_processing(task_identifier)
 
             execution_steps: List[ResearchStep] = []
-            step_counter = 0
-
-            for event in self.app.stream(base_state, langgraph_config):
-                step_counter += 1
-
-                if step_counter > config.max_steps:
-                    logger.warning("达到最大步数 %s，停止研究", config.max_steps)
-                    break
-
-                step = self._parse_event(event, step_counter)
-                if step:
-                    execution_steps.append(step)
-                    logger.debug("步骤 %s: %s - %s", step.step_id, step.node_name, step.action)
-                    self._publish_stream_step(task_identifier, step)
-
-                    if step.node_name == NodeName.WAIT_FOR_HUMAN:
-                        request = self._extract_human_request(event, step.node_name)
-                        if request:
-                            self.task_hub.mark_human_request(task_identifier, request)
-                            self._publish_human_request(task_identifier, request)
-
-                if config.callback:
-                    try:
-                        config.callback(
-                            {
-                                "type": "step",
-                                "step": step.step_id if step else step_counter,
-                                "node": step.node_name if step else "unknown",
-                                "action": step.action if step else "processing",
-                                "event": event,
-                            }
-                        )
-                    except Exception as cb_exc:
-                        logger.warning("回调函数执行失败: %s", cb_exc)
-
-                if self.task_hub.is_cancelled(task_identifier):
-                    raise RuntimeError(ErrorMessages.TASK_CANCELLED)
+            truncated = False
+
+            # 多拉取一个事件用于区分“恰好在 max_steps 步自然结束”与“被截断”；
+            # 提前退出时显式关闭生成器，及时释放 LangGraph 的执行上下文
+            stream = self.app.stream(base_state, langgraph_config)
+            batcher = (
+                _CallbackBatcher(config.callback, config.callback_flush_ms)
+                if config.callback and config.callback_flush_ms > 0
+                else None
+            )
+            try:
+                for step_counter, event in enumerate(islice(stream, config.max_steps + 1), start=1):
+                    if step_counter > config.max_steps:
+                        truncated = True
+                        break
+                    step = self._parse_event(event, step_counter, started_at, started_monotonic)
+                    if step:
+                        execution_steps.append(step)
+                        logger.debug("步骤 %s: %s - %s", step.step_id, step.node_name, step.action)
+                        self._publish_stream_step(task_identifier, step)
+
+                        if step.node_name == NodeName.WAIT_FOR_HUMAN:
+                            request = self._extract_human_request(event, step.node_name)
+                            if request:
+                                self.task_hub.mark_human_request(task_identifier, request)
+                                self._publish_human_request(task_identifier, request)
+
+                    if config.callback:
+                        payload = {
+                            "type": "step",
+                            "step": step.step_id if step else step_counter,
+                            "node": step.node_name if step else "unknown",
+                            "action": step.action if step else "processing",
+                            "event": event,
+                        }
+                        if batcher is not None:
+                            batcher.add(payload)
+                        else:
+                            try:
+                                config.callback(payload)
+                            except Exception as cb_exc:
+                                logger.warning("回调函数执行失败: %s", cb_exc)
+
+                    if self.task_hub.is_cancelled(task_identifier):
+                        raise RuntimeError(ErrorMessages.TASK_CANCELLED)
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+                if batcher is not None:
+                    batcher.flush()
+
+            if truncated:
+                logger.warning("达到最大步数 %s，停止研究", config.max_steps)
 
             final_state = self.app.get_state(langgraph_config).values
             self.task_hub.set_last_state(task_identifier, final_state)
@@ -379,11 +507,18 @@ class ResearchService:
 
 
     def _parse_event(
-        self, event: Dict[str, Any], step_id: int
+        self,
+        event: Dict[str, Any],
+        step_id: int,
+        started_at: float = 0.0,
+        started_monotonic: Optional[float] = None,
     ) -> Optional[ResearchStep]:
         """
         解析 LangGraph 事件为研究步骤。
 
+        started_at / started_monotonic 为本次研究开始时的墙钟时间与单调时钟读数，
+        步骤只记录毫秒偏移；未提供时以当前时刻为准（偏移为 0）。
+
         LangGraph 事件格式：
         {
             "node_name": {"key": value, ...}
@@ -400,81 +535,54 @@ class ResearchService:
             # 根据节点类型解析动作
             action = self._describe_action(node_name, node_data)
 
+            if started_monotonic is None:
+                started_at, elapsed_ms = time.time(), 0
+            else:
+                elapsed_ms = int((time.monotonic() - started_monotonic) * 1000)
+
             return ResearchStep(
                 step_id=step_id,
                 node_name=node_name,
                 action=action,
                 status="success",
-                timestamp=datetime.now().isoformat(),
-                details={"data": node_data},
+                timestamp_ms=elapsed_ms,
+                # 只记录节点输出的键名，不持有整份输出（tool_executor 等节点可能携带大量条目）
+                details={"keys": list(node_data)},
+                started_at=started_at,
             )
 
         return None
 
     def _describe_action(self, node_name: str, node_data: Dict[str, Any]) -> str:
         """根据节点名称和数据描述动作"""
-        if node_name == "router":
-            decision = node_data.get("router_decision", {})
-            route = decision.get("route", "unknown") if isinstance(decision, dict) else "unknown"
-            return f"路由决策: {route}"
-
-        elif node_name == "simple_chat":
-            return "简单对话响应"
-
-        elif node_name == "planner":
-            tool_call = node_data.get("next_tool_call")
-            if tool_call:
-                plugin_id = tool_call.get("plugin_id", "unknown")
-                return f"规划下一步: 调用工具 {plugin_id}"
-            return "规划下一步"
-
-        elif node_name == "tool_executor":
-            return "执行工具调用"
-
-        elif node_name == "data_stasher":
-            return "数据暂存和摘要"
-
-        elif node_name == "reflector":
-            reflection = node_data.get("reflection", {})
-            decision = reflection.get("decision", "unknown") if isinstance(reflection, dict) else "unknown"
-            return f"反思决策: {decision}"
-
-        elif node_name == "synthesizer":
-            return "生成最终报告"
-
-        elif node_name == NodeName.WAIT_FOR_HUMAN:
-            return "等待人工介入"
-
-        else:
+        handler = _ACTION_HANDLERS.get(node_name)
+        if handler is None:
             return f"执行节点: {node_name}"
+        return handler(node_data)
 
     def _format_data_stash(
         self, data_stash: List[Any]
     ) -> List[Dict[str, Any]]:
-        """格式化数据引用列表"""
-        formatted = []
-        for ref in data_stash:
-            # 检查是否是 DataReference 对象
-            if hasattr(ref, "data_id"):
-                formatted.append(
-                    {
-                        "step_id": ref.step_id,
-                        "tool_name": ref.tool_name,
-                        "data_id": ref.data_id,
-                        "summary": ref.summary[:200],  # 截断摘要
-                        "status": ref.status,
-                    }
-                )
-            elif isinstance(ref, dict):
-                formatted.append(ref)
-
-        return formatted
+        """格式化数据引用列表（DataReference 转为字典，字典原样保留，其余忽略）"""
+        return [
+            {
+                "step_id": ref.step_id,
+                "tool_name": ref.tool_name,
+                "data_id": ref.data_id,
+                "summary": ref.summary[:200],  # 截断摘要
+                "status": ref.status,
+            }
+            if isinstance(ref, DataReference)
+            else ref
+            for ref in data_stash
+            if isinstance(ref, (DataReference, dict))
+        ]
 
     def _publish_stream_step(self, task_id: str, step: ResearchStep) -> None:
         event = {
             "type": StreamEventType.STEP,
             "task_id": task_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "data": {
                 "step_id": step.step_id,
                 "node": step.node_name,
@@ -489,7 +597,7 @@ class ResearchService:
         event = {
             "type": StreamEventType.HUMAN_IN_LOOP,
             "task_id": task_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "data": {"message": message},
         }
         self.task_hub.publish_event(task_id, event)
@@ -587,11 +695,14 @@ class ResearchService:
 
     def close(self):
         """清理资源"""
-        # 关闭线程池，等待正在执行的任务完成
-        if hasattr(self, "_executor"):
-            logger.info("正在关闭研究任务线程池...")
-            self._executor.shutdown(wait=True, cancel_futures=False)
-            logger.info("研究任务线程池已关闭")
+        # 等待本实例提交的恢复任务完成（共享线程池由进程统一关闭）
+        with self._pending_lock:
+            pending = list(self._pending_resumes)
+        if pending:
+            logger.info("等待 %d 个研究恢复任务完成...", len(pending))
+            wait(pending)
+
+        self._tool_cache.clear()
 
         # 关闭数据查询服务
         if self.data_query_service:
@@ -6,10 +6,11 @@
 from __future__ import annotations
 
 import threading
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from queue import SimpleQueue
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any, Tuple
 
 from services.research_constants import TaskStatus, StreamEventType, DefaultConfig
 
@@ -27,19 +28,55 @@ class ResearchTaskContext:
     human_request: Optional[str] = None
     cancelled: bool = False
     responses: List[Dict[str, Any]] = field(default_factory=list)
-    history: List[Dict[str, Any]] = field(default_factory=list)
-    listeners: List[SimpleQueue] = field(default_factory=list)
+    history: Deque[Dict[str, Any]] = field(default_factory=deque)  # 由 Hub 按 history_limit 设定 maxlen
+    # 写时复制：注册/注销时在锁内整体替换，发布事件时直接遍历当前元组，无需加锁或拷贝
+    listeners: Tuple[SimpleQueue, ...] = ()
     last_state: Optional[Dict[str, Any]] = None
     ready_event: threading.Event = field(default_factory=threading.Event)
+    # 合并投递：窗口内的事件暂存于 pending_batch，由 flush_timer 到期后一次性投递
+    pending_batch: List[Dict[str, Any]] = field(default_factory=list)
+    flush_timer: Optional[threading.Timer] = None
+    batch_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def has_listeners(self) -> bool:
+        return bool(self.listeners)
+
+
+def utc_now_iso() -> str:
+    """事件时间戳：当前 UTC 时间的 ISO 字符串（所有研究事件统一经此生成）。"""
+    return datetime.utcnow().isoformat()
+
+
+# 交互/终止类事件到达时立即投递（连同此前暂存的事件），保证前端及时收到且顺序不变
+_FLUSH_IMMEDIATELY = frozenset(
+    {
+        StreamEventType.HUMAN_IN_LOOP,
+        StreamEventType.HUMAN_RESPONSE_ACK,
+        StreamEventType.COMPLETE,
+        StreamEventType.ERROR,
+        StreamEventType.CANCELLED,
+    }
+)
 
 
 class ResearchTaskHub:
     """管理研究任务的实时事件与监听者。"""
 
-    def __init__(self, history_limit: int = DefaultConfig.HISTORY_LIMIT):
+    def __init__(self, history_limit: int = DefaultConfig.HISTORY_LIMIT, batch_window_ms: int = 0):
+        """
+        Args:
+            history_limit: 每个任务保留的历史事件数
+            batch_window_ms: 事件合并投递窗口（毫秒）；0 表示逐条投递。
+                大于 0 时窗口内的多条事件以 {"type": "batch", "events": [...]}
+                一次放入监听队列，消费方需自行拆开
+        """
         self._tasks: Dict[str, ResearchTaskContext] = {}
         self._lock = threading.Lock()
+        # task_id -> [就绪事件, 等待者数量]：任务创建前到达的 wait_for_task 调用
+        self._pending_waiters: Dict[str, List[Any]] = {}
         self._history_limit = history_limit
+        self._batch_window = batch_window_ms / 1000
 
     def ensure_task(
         self,
@@ -56,14 +93,18 @@ class ResearchTaskHub:
                     thread_id=thread_id,
                     base_query=base_query,
                     filter_datasource=filter_datasource,
+                    history=deque(maxlen=self._history_limit),
                 )
                 self._tasks[task_id] = context
             else:
                 context.thread_id = thread_id
                 context.base_query = base_query
                 context.filter_datasource = filter_datasource
-            # 标记任务已就绪
+            # 标记任务已就绪，并唤醒任务创建前就在等待的调用方
             context.ready_event.set()
+            waiter = self._pending_waiters.pop(task_id, None)
+            if waiter is not None:
+                waiter[0].set()
             return context
 
     def create_task(self, task_id: str, thread_id: str) -> ResearchTaskContext:
@@ -80,12 +121,51 @@ class ResearchTaskHub:
         if not context:
             return
 
-        # 限制历史长度，避免内存占用
-        context.history.append(event)
-        if len(context.history) > self._history_limit:
-            context.history = context.history[-self._history_limit :]
+        # history 为定长 deque，超出 history_limit 时自动丢弃最旧的事件
+        if self._batch_window <= 0:
+            context.history.append(event)
+            self._deliver(context, event)
+            return
 
-        for listener in list(context.listeners):
+        with context.batch_lock:
+            context.history.append(event)
+            if not context.has_listeners:
+                # 无人监听时只记录历史（监听者注册时回放），不启动合并定时器
+                return
+            context.pending_batch.append(event)
+            if event.get("type") in _FLUSH_IMMEDIATELY:
+                self._flush_locked(context)
+            elif context.flush_timer is None:
+                timer = threading.Timer(self._batch_window, self._flush_batch, args=(context,))
+                timer.daemon = True
+                context.flush_timer = timer
+                timer.start()
+
+    def _flush_batch(self, context: ResearchTaskContext) -> None:
+        """合并窗口到期：投递暂存的事件。"""
+        with context.batch_lock:
+            self._flush_locked(context)
+
+    @staticmethod
+    def _flush_locked(context: ResearchTaskContext) -> None:
+        """投递暂存的事件（调用方需持有 context.batch_lock，保证批次之间不乱序）。"""
+        timer, context.flush_timer = context.flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        events, context.pending_batch = context.pending_batch, []
+        if not events:
+            return
+        if len(events) == 1:
+            ResearchTaskHub._deliver(context, events[0])
+        else:
+            ResearchTaskHub._deliver(
+                context,
+                {"type": StreamEventType.BATCH, "task_id": context.task_id, "events": events},
+            )
+
+    @staticmethod
+    def _deliver(context: ResearchTaskContext, event: Dict[str, Any]) -> None:
+        for listener in context.listeners:
             try:
                 listener.put_nowait(event)
             except Exception:
@@ -99,11 +179,15 @@ class ResearchTaskHub:
             raise KeyError(f"未找到任务 {task_id}")
 
         queue: SimpleQueue = SimpleQueue()
-        for event in context.history:
-            queue.put_nowait(event)
-
-        with self._lock:
-            context.listeners.append(queue)
+        # 回放与注册在 batch_lock 内完成：先把暂存批次投给已有监听者，
+        # 避免新监听者回放历史后又从批次中重复收到同一事件
+        with context.batch_lock:
+            self._flush_locked(context)
+            for event in context.history:
+                queue.put_nowait(event)
+
+            with self._lock:
+                context.listeners = context.listeners + (queue,)
         return queue
 
     def unregister_listener(self, task_id: str, queue: SimpleQueue) -> None:
@@ -111,8 +195,7 @@ class ResearchTaskHub:
         if not context:
             return
         with self._lock:
-            if queue in context.listeners:
-                context.listeners.remove(queue)
+            context.listeners = tuple(q for q in context.listeners if q is not queue)
 
     def mark_human_request(self, task_id: str, message: str) -> None:
         context = self.get_task(task_id)
@@ -134,7 +217,7 @@ class ResearchTaskHub:
             raise KeyError(f"未找到任务 {task_id}")
         payload = {
             "response": response,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
         }
         context.responses.append(payload)
         context.status = TaskStatus.PROCESSING
@@ -158,7 +241,7 @@ class ResearchTaskHub:
         event = {
             "type": StreamEventType.CANCELLED,
             "task_id": task_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "data": {"reason": reason},
         }
         self.publish_event(task_id, event)
@@ -174,7 +257,7 @@ class ResearchTaskHub:
         event = {
             "type": StreamEventType.COMPLETE if success else StreamEventType.ERROR,
             "task_id": task_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "data": {
                 "success": success,
                 "final_report": final_report,
@@ -191,7 +274,7 @@ class ResearchTaskHub:
         event = {
             "type": StreamEventType.ERROR,
             "task_id": task_id,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_now_iso(),
             "data": {"message": message},
         }
         self.publish_event(task_id, event)
@@ -208,6 +291,9 @@ class ResearchTaskHub:
         """
         等待任务创建就绪（使用事件机制，避免轮询）。
 
+        任务尚未创建时只登记一个等待事件，不会在任务表中插入占位上下文；
+        ensure_task 创建任务时唤醒所有等待者。
+
         Args:
             task_id: 任务ID
             timeout: 超时时间（秒），默认10秒
@@ -215,27 +301,25 @@ class ResearchTaskHub:
         Returns:
             True 表示任务已就绪，False 表示超时
         """
-        # 先检查任务是否已存在
-        context = self.get_task(task_id)
-        if context:
-            return context.ready_event.wait(timeout)
-
-        # 任务不存在，创建一个占位上下文用于等待
         with self._lock:
-            if task_id not in self._tasks:
-                # 创建占位上下文（状态为 pending）
-                placeholder = ResearchTaskContext(
-                    task_id=task_id,
-                    thread_id="",
-                    status=TaskStatus.PENDING,
-                )
-                self._tasks[task_id] = placeholder
-                context = placeholder
-            else:
-                context = self._tasks[task_id]
+            context = self._tasks.get(task_id)
+            if context is None:
+                waiter = self._pending_waiters.get(task_id)
+                if waiter is None:
+                    waiter = self._pending_waiters[task_id] = [threading.Event(), 0]
+                waiter[1] += 1
+
+        if context is not None:
+            return context.ready_event.wait(timeout)
 
-        # 等待事件触发
-        return context.ready_event.wait(timeout)
+        try:
+            return waiter[0].wait(timeout)
+        finally:
+            # 最后一个等待者离开时清理登记（任务已创建时 ensure_task 已将其移除）
+            with self._lock:
+                waiter[1] -= 1
+                if waiter[1] == 0 and self._pending_waiters.get(task_id) is waiter:
+                    del self._pending_waiters[task_id]
 
     def set_last_state(self, task_id: str, state: Dict[str, Any]) -> None:
         context = self.get_task(task_id)
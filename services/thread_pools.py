@@ -0,0 +1,67 @@
+"""
+进程级共享线程池
+
+按工作负载类型划分线程池（如 rag_query / llm / io），服务实例绑定到共享池，
+避免每个实例各自创建线程池、线程数随实例数量成倍增长。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 未指定大小时各类线程池的默认线程数
+DEFAULT_POOL_SIZES: Dict[str, int] = {
+    "rag_query": 8,  # RAG 子查询（网络 IO 为主）
+    "llm": 4,  # 长时间运行的 LLM 工作流
+    "io": 4,  # 其他阻塞 IO
+}
+_FALLBACK_POOL_SIZE = 4
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    获取指定名称的共享线程池（首次调用时创建）
+
+    Args:
+        name: 线程池名称（工作负载类型）
+        max_workers: 线程数，仅在首次创建时生效；为 None 时使用 DEFAULT_POOL_SIZES。
+            池已存在且大小不同时记录警告并返回已有的池，调用方应以池的实际大小为准
+
+    Returns:
+        ThreadPoolExecutor: 共享线程池，调用方不应自行 shutdown
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                size = max_workers or DEFAULT_POOL_SIZES.get(name, _FALLBACK_POOL_SIZE)
+                pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{name}-pool")
+                _pools[name] = pool
+                logger.info("创建共享线程池 %s (max_workers=%d)", name, size)
+                return pool
+
+    if max_workers and max_workers != pool._max_workers:
+        logger.warning(
+            "共享线程池 %s 已以 max_workers=%d 创建，忽略请求的 max_workers=%d",
+            name,
+            pool._max_workers,
+            max_workers,
+        )
+    return pool
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    """关闭并移除全部共享线程池（进程退出或测试清理时调用）"""
+    with _lock:
+        pools = list(_pools.items())
+        _pools.clear()
+    for name, pool in pools:
+        logger.info("关闭共享线程池 %s", name)
+        pool.shutdown(wait=wait)
@@ -252,6 +252,18 @@ def test_cache_statistics():
     print("✓ 统计信息验证通过")
 
 
+def test_has_rag_cache_does_not_touch_statistics():
+    """测试 has_rag_cache 只检查是否存在，不计入命中率统计"""
+    cache = CacheService()
+    cache.set_rag_cache("查询", {"result": 1}, filter_datasource="")
+
+    assert cache.has_rag_cache("查询", filter_datasource="")
+    assert not cache.has_rag_cache("查询", filter_datasource="bilibili")
+    stats = cache.get_stats()
+    assert stats['rag_hits'] == 0
+    assert stats['rag_misses'] == 0
+
+
 def test_global_cache_service():
     """测试全局缓存服务"""
     print("\n" + "="*80)
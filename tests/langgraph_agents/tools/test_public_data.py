@@ -0,0 +1,89 @@
+"""测试 fetch_public_data 工具"""
+import sys
+import types
+
+# Stub for rag_system
+if "rag_system" not in sys.modules:
+    rag_system_stub = types.ModuleType("rag_system")
+    rag_system_stub.__path__ = []
+    sys.modules["rag_system"] = rag_system_stub
+
+if "rag_system.rag_pipeline" not in sys.modules:
+    rag_pipeline_stub = types.ModuleType("rag_system.rag_pipeline")
+
+    class _StubRAGPipeline:
+        def search(self, *args, **kwargs):
+            return []
+
+    rag_pipeline_stub.RAGPipeline = _StubRAGPipeline
+    sys.modules["rag_system.rag_pipeline"] = rag_pipeline_stub
+
+from langgraph_agents.tools.public_data import PUBLIC_DATA_CACHE_KEY, register_public_data_tool
+from langgraph_agents.tools.registry import ToolRegistry
+from langgraph_agents.runtime import ToolExecutionContext
+from langgraph_agents.state import ToolCall
+
+
+class _StubDataQueryService:
+    """记录调用次数的数据查询服务"""
+
+    def __init__(self, status="success"):
+        self.status = status
+        self.calls = []
+
+    def query(self, user_query, filter_datasource=None, use_cache=True):
+        self.calls.append((user_query, filter_datasource))
+        return types.SimpleNamespace(
+            status=self.status,
+            feed_title="热搜",
+            generated_path="/bilibili/hot-search",
+            items=[{"title": "a"}],
+            source="rag",
+            cache_hit=False,
+            reasoning="stub",
+            clarification_question=None,
+        )
+
+
+def _build_tool():
+    registry = ToolRegistry()
+    register_public_data_tool(registry)
+    return registry.get("fetch_public_data")
+
+
+def _call(query="B站热搜", datasource=None):
+    args = {"query": query}
+    if datasource:
+        args["filter_datasource"] = datasource
+    return ToolCall(plugin_id="fetch_public_data", args=args, step_id=1, description="查询")
+
+
+def test_fetch_public_data_reuses_cached_result():
+    """相同 (query, datasource) 重复调用时命中缓存，不再查询 DataQueryService"""
+    tool = _build_tool()
+    dq = _StubDataQueryService()
+    context = ToolExecutionContext(data_query_service=dq, extras={PUBLIC_DATA_CACHE_KEY: {}})
+
+    first = tool.handler(_call(), context)
+    second = tool.handler(_call(), context)
+    tool.handler(_call(datasource="bilibili"), context)
+
+    assert dq.calls == [("B站热搜", None), ("B站热搜", "bilibili")]
+    assert first.raw_output["cache_hit"] is False
+    assert second.status == "success"
+    assert second.raw_output["cache_hit"] is True
+    assert second.raw_output["items"] == first.raw_output["items"]
+
+
+def test_fetch_public_data_does_not_cache_errors():
+    """失败结果不写入缓存，下次调用仍会重新查询"""
+    tool = _build_tool()
+    dq = _StubDataQueryService(status="error")
+    cache = {}
+    context = ToolExecutionContext(data_query_service=dq, extras={PUBLIC_DATA_CACHE_KEY: cache})
+
+    assert tool.handler(_call(), context).status == "error"
+    assert tool.handler(_call(), context).status == "error"
+
+    assert len(dq.calls) == 2
+    assert cache == {}
@@ -5,6 +5,7 @@
 """
 
 import pytest
+from pydantic import BaseModel
 
 import services.panel.adapters as adapters
 from api.schemas.panel import SourceInfo
@@ -181,6 +182,31 @@ def test_manifest_lists_available_components():
     assert line_chart_entry.cost == "medium"
 
 
+def test_manifest_indexes_components_by_id():
+    """测试 manifest 在构造时建立 component_id 索引"""
+    manifest = adapters.get_route_manifest("/github/trending/weekly")
+    assert manifest is not None
+
+    assert set(manifest.components_by_id) == {"ListPanel", "LineChart"}
+    assert manifest.components_by_id["LineChart"] is next(
+        entry for entry in manifest.components if entry.component_id == "LineChart"
+    )
+
+
+def test_manifest_precomputes_required_ids():
+    """测试 manifest 在构造时按声明顺序记录必选组件"""
+    from services.panel.adapters.registry import ComponentManifestEntry, RouteAdapterManifest
+
+    manifest = RouteAdapterManifest(
+        components=[
+            ComponentManifestEntry(component_id="LineChart"),
+            ComponentManifestEntry(component_id="ListPanel", required=True),
+            ComponentManifestEntry(component_id="Table", required=True),
+        ]
+    )
+    assert manifest.required_ids == ("ListPanel", "Table")
+
+
 def test_backwards_compat_adapter_without_context_param():
     """测试向后兼容：不接受 context 参数的旧 adapter 也能正常工作"""
     from services.panel.adapters.registry import route_adapter, RouteAdapterResult
@@ -224,3 +250,89 @@ def test_default_adapter_warning():
     assert "warning" in result.stats
     assert "/nonexistent/route" in result.stats["warning"]
     assert result.block_plans == []
+
+
+def test_registry_keeps_routes_sorted_by_specificity():
+    """测试注册表按路由长度降序维护，等长路由保持注册顺序"""
+    from services.panel.adapters.registry import RouteAdapterRegistry
+
+    registry = RouteAdapterRegistry()
+    for route in ["/a", "/a/b/c", "/x/y", "/a/b"]:
+        registry.register(route, lambda *_: None)
+
+    assert [route for route, _ in registry._routes] == ["/a/b/c", "/x/y", "/a/b", "/a"]
+
+
+def test_validate_records_table_and_unknown_component():
+    """测试 Table 仅校验首个 TableViewModel，未知组件原样返回"""
+    table = {"columns": [{"key": "name", "label": "名称"}], "rows": [{"name": "a"}]}
+    validated = validate_records("Table", [table, {"broken": True}])
+    assert len(validated) == 1
+    assert validated[0]["columns"][0]["key"] == "name"
+
+    records = [{"anything": 1}]
+    assert validate_records("UnknownComponent", records) == records
+
+
+def test_ensure_helpers_accept_any_sequence():
+    """测试 ensure_* 批量校验接受元组输入并返回模型实例"""
+    from services.panel.view_models import ListPanelRecord, ensure_list_panel
+
+    models = ensure_list_panel(({"id": "1", "title": "a"}, {"id": "2", "title": "b"}))
+    assert [type(model) for model in models] == [ListPanelRecord, ListPanelRecord]
+    assert [model.title for model in models] == ["a", "b"]
+
+
+def test_list_panel_validate_records_matches_model_dump():
+    """测试 ListPanel 校验结果与 model_dump 一致：容器转为列表、bytes 转为字符串、不与输入共享对象"""
+    from services.panel.view_models import ListPanelRecord
+
+    record = {"id": "1", "title": b"bytes", "categories": ("a", "b"), "extra": 1}
+    validated = validate_records("ListPanel", [record])
+
+    assert validated == [ListPanelRecord.model_validate(record).model_dump()]
+    assert validated[0]["title"] == "bytes"
+    assert validated[0]["categories"] == ["a", "b"]
+    assert validated[0]["link"] is None
+
+    listed = {"id": "2", "title": "t", "categories": ["x"]}
+    assert validate_records("ListPanel", [listed])[0]["categories"] is not listed["categories"]
+
+
+def test_enum_like_fields_reject_unknown_values():
+    """测试趋势、列类型、对齐方式等枚举字段拒绝未声明的取值"""
+    with pytest.raises(ContractViolation):
+        validate_records(
+            "StatisticCard",
+            [{"id": "m", "metric_title": "t", "metric_value": 1.0, "metric_trend": "sideways"}],
+        )
+    with pytest.raises(ContractViolation):
+        validate_records(
+            "Table",
+            [{"columns": [{"key": "a", "label": "A", "align": "justify"}], "rows": []}],
+        )
+
+
+class _Point(BaseModel):
+    a: int
+
+
+@pytest.mark.parametrize(
+    ("component_id", "record"),
+    [
+        ("StatisticCard", {"id": "m", "metric_title": "t", "metric_value": 3, "extra": {"p": _Point(a=1)}}),
+        ("NumberView", {"id": "n", "label": "l", "value": "2.5", "delta": {"p": _Point(a=2)}}),
+        ("LineChart", {"x": _Point(a=1), "y": 1}),
+        ("MediaCardGrid", {"id": "c", "title": "t", "badges": ["hot"], "view_count": 10}),
+    ],
+)
+def test_validate_records_serializes_nested_values(component_id, record):
+    """测试 Any/dict/额外字段中的嵌套模型与 model_dump 一样被递归导出为字典"""
+    from services.panel.view_models import _DISPATCH
+
+    adapter = _DISPATCH[component_id]
+    expected = adapter.dump_python(adapter.validate_python([record]))
+    validated = validate_records(component_id, [record])
+
+    assert validated == expected
+    assert "_Point" not in repr(validated)
@@ -157,6 +157,36 @@ def test_chat_service_ignores_empty_planner_components(monkeypatch):
     assert requested is None
 
 
+def test_chat_service_reports_shortcut_planner_engine():
+    """planner 跳过 LLM 的确定性决策上报为 shortcut，而非 llm"""
+    from services.chat.utils import merge_planner_engines
+    from services.panel.llm_component_planner import SHORTCUT_REASON
+
+    class _StubLLMPlanner:
+        def is_available(self):
+            return True
+
+        def plan_batch(self, requests):
+            return [
+                PlannerDecision(components=["ListPanel"], reasons=[SHORTCUT_REASON, "single"]),
+                PlannerDecision(components=["ListPanel"], reasons=["engine: llm"]),
+            ]
+
+    chat = ChatService(data_query_service=_DummyDataQueryService(_make_success_query_result()))
+    chat.llm_component_planner = _StubLLMPlanner()
+
+    planned = chat._plan_components_for_sources(
+        [("/demo/route", 1), ("/demo/route", 2)],
+        user_query="demo",
+        layout_snapshot=None,
+    )
+
+    assert [engine for _, _, engine in planned] == ["shortcut", "llm"]
+    assert merge_planner_engines(["shortcut", "shortcut"]) == "shortcut"
+    assert merge_planner_engines(["shortcut", "rule"]) == "shortcut"
+    assert merge_planner_engines(["shortcut", "llm"]) == "llm"
+
+
 class _StubResearchService:
     def __init__(self):
         self.calls = []
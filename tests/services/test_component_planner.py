@@ -91,3 +91,23 @@ def test_allow_optional_false_excludes_optional_components():
     assert decision.components == ["ListPanel"]
     # 不包含可选的 LineChart
     assert "LineChart" not in decision.components
+
+
+def test_planner_keeps_skip_reasons_when_required_fills_max():
+    """测试必选组件已占满 max_components 时，后续阶段的过滤理由仍保留在 reasons 中"""
+    config = ComponentPlannerConfig(max_components=1)
+    context = PlannerContext(item_count=2)
+    decision = plan_components_for_route("/github/trending/daily", config=config, context=context)
+    assert decision is not None
+    assert decision.components == ["ListPanel"]
+    # 后续阶段仍会评估可选组件，数据量不足的 LineChart 留下过滤理由
+    assert any("Skip LineChart" in reason for reason in decision.reasons)
+
+
+def test_planner_inputs_normalize_sequences_to_tuples():
+    """测试配置与上下文在构造时将序列字段统一为元组"""
+    config = ComponentPlannerConfig(preferred_components=["LineChart"])
+    context = PlannerContext(user_preferences=["chart"])
+    assert config.preferred_components == ("LineChart",)
+    assert context.user_preferences == ("chart",)
+    hash(config)
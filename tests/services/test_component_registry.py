@@ -0,0 +1,11 @@
+from services.panel.component_registry import ComponentRegistry
+
+
+def test_find_compatible_matches_requirements():
+    """测试按可用语义标签匹配组件"""
+    registry = ComponentRegistry()
+    component_ids = [c.id for c in registry.find_compatible(["title", "link", "description"])]
+    assert "ListPanel" in component_ids
+    assert "FallbackRichText" in component_ids
+    assert "LineChart" not in component_ids
+
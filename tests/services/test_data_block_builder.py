@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+from api.schemas.panel import SourceInfo
+from services.panel.data_block_builder import DataBlockBuilder
+
+
+@dataclass
+class Item:
+    title: str
+    score: int
+
+
+class PlainItem:
+    def __init__(self, title):
+        self.title = title
+
+
+def _source(route="/unregistered/route"):
+    return SourceInfo(datasource="test", route=route)
+
+
+def test_record_to_dict_handles_supported_record_types():
+    """测试各类记录转换为字典"""
+    assert DataBlockBuilder._record_to_dict({"a": 1}) == {"a": 1}
+    assert DataBlockBuilder._record_to_dict(Item(title="x", score=2)) == {"title": "x", "score": 2}
+    assert DataBlockBuilder._record_to_dict(PlainItem("y")) == {"title": "y"}
+    assert DataBlockBuilder._record_to_dict(3) == {"value": 3}
+
+
+@dataclass
+class Author:
+    name: str
+
+
+@dataclass
+class Post:
+    title: str
+    author: Author
+    tags: list
+
+
+def test_record_to_dict_converts_nested_dataclasses_like_asdict():
+    """测试含嵌套 dataclass/容器的记录与 asdict 结果一致，Schema 推断为 object/array"""
+    from dataclasses import asdict
+
+    post = Post(title="t", author=Author(name="a"), tags=[Author(name="b")])
+    converted = DataBlockBuilder._record_to_dict(post)
+
+    assert converted == asdict(post)
+    assert converted["author"] == {"name": "a"}
+    assert converted["tags"] is not post.tags
+
+    block = DataBlockBuilder().build("block-1", [post], _source()).data_block
+    types = {field.name: field.type for field in block.schema_summary.fields}
+    assert types["author"] == "object"
+    assert types["tags"] == "array"
+
+
+def test_record_to_dict_returns_copies():
+    """测试转换结果不与原始记录共享顶层字典"""
+    record = {"a": 1}
+    converted = DataBlockBuilder._record_to_dict(record)
+    converted["a"] = 2
+    assert record == {"a": 1}
+
+
+def test_build_trims_records_and_summarizes_schema():
+    """测试构建 DataBlock 时截断记录并生成 schema 摘要"""
+    builder = DataBlockBuilder(max_records=2)
+    records = [Item(title=f"t{i}", score=i) for i in range(5)]
+    result = builder.build("block-1", records, _source())
+
+    block = result.data_block
+    assert block.records == [{"title": "t0", "score": 0}, {"title": "t1", "score": 1}]
+    assert block.stats["total"] == 5
+    assert block.schema_summary.stats["total"] == 2
+    assert {field.name for field in block.schema_summary.fields} == {"title", "score"}
+    assert result.block_plans == []
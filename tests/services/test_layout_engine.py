@@ -0,0 +1,53 @@
+from api.schemas.panel import LayoutHint, UIBlock
+from services.panel.layout_engine import LayoutEngine
+
+
+def _block(block_id, **options):
+    return UIBlock(id=block_id, component="ListPanel", options=options)
+
+
+def test_layout_sizes_pack_into_rows():
+    """测试 layout_size 映射为栅格宽度并按行排布"""
+    blocks = [_block("a"), _block("b"), _block("c")]
+    hints = {
+        "a": LayoutHint(layout_size="half"),
+        "b": LayoutHint(layout_size="half"),
+        "c": LayoutHint(layout_size="third"),
+    }
+    tree = LayoutEngine().build(mode="append", blocks=blocks, layout_hints=hints)
+
+    grids = [node.props["grid"] for node in tree.nodes]
+    assert [(g["x"], g["y"], g["w"]) for g in grids] == [(0, 0, 6), (6, 0, 6), (0, 1, 4)]
+    assert [node.children for node in tree.nodes] == [["a"], ["b"], ["c"]]
+    assert tree.nodes[0].props["layout"] == {"size": "half"}
+    assert tree.nodes[0].props["span"] == 6
+
+
+def test_min_height_sets_height_units():
+    """测试 min_height 向上取整为行高单位"""
+    blocks = [_block("a", min_height=500), _block("b")]
+    hints = {"b": LayoutHint(span=4, min_height=221, order=2, priority=1)}
+    tree = LayoutEngine().build(mode="replace", blocks=blocks, layout_hints=hints)
+
+    first, second = tree.nodes
+    assert first.props["grid"]["h"] == 3
+    assert first.props["grid"]["minH"] == 3
+    assert first.props["grid"]["w"] == 12
+    assert second.props["grid"] == {"x": 0, "y": 3, "w": 4, "h": 2, "minH": 2}
+    assert second.props["span"] == 4
+    assert second.props["order"] == 2
+    assert second.props["priority"] == 1
+    assert second.props["min_height"] == 221
+
+
+def test_invalid_span_falls_back_to_full_width():
+    """测试无法解析的 span 回退为整行"""
+    tree = LayoutEngine().build(mode="append", blocks=[_block("a", span="wide")])
+    assert tree.nodes[0].props["grid"]["w"] == 12
+    assert tree.nodes[0].props["span"] == "wide"
+
+
+def test_empty_blocks_produce_empty_tree():
+    tree = LayoutEngine().build(mode="append", blocks=[], history_token="t")
+    assert tree.nodes == []
+    assert tree.history_token == "t"
@@ -0,0 +1,587 @@
+import asyncio
+import json
+
+from services.panel.adapters import ComponentManifestEntry, RouteAdapterManifest
+from services.panel.component_planner import ComponentPlannerConfig, PlannerContext
+from services.panel.llm_component_planner import LLMComponentPlanner, PlanRequest
+
+
+MANIFEST = RouteAdapterManifest(
+    components=[
+        ComponentManifestEntry(component_id="ListPanel", required=True),
+        ComponentManifestEntry(component_id="LineChart", default_selected=False),
+        ComponentManifestEntry(component_id="StatisticCard", cost="low"),
+    ],
+    notes="test manifest",
+)
+
+
+class FakeLLMClient:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.response
+
+
+class SequenceLLMClient(FakeLLMClient):
+    def __init__(self, responses):
+        super().__init__(None)
+        self.responses = list(responses)
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class FakeAsyncLLMClient(FakeLLMClient):
+    def __init__(self, response, delay=0.0):
+        super().__init__(response)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def agenerate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return self.response
+
+
+def _plan(planner, *, raw_query="看看趋势", max_components=3):
+    return planner.plan(
+        route="/test/route",
+        manifest=MANIFEST,
+        context=PlannerContext(item_count=10, raw_query=raw_query),
+        config=ComponentPlannerConfig(max_components=max_components),
+    )
+
+
+def test_plan_filters_unknown_and_duplicate_components():
+    """测试过滤 manifest 中不存在的组件并去重"""
+    response = json.dumps(
+        {
+            "selected": ["LineChart", "Unknown", "LineChart", "ListPanel"],
+            "reasons": ["trend", "?", "dup", "list"],
+        }
+    )
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(response))
+    decision = _plan(planner)
+    assert decision is not None
+    assert decision.components == ["ListPanel", "LineChart"]
+    assert decision.reasons[0] == "engine: llm"
+
+
+def test_plan_prepends_missing_required_components():
+    """测试 LLM 遗漏必选组件时自动补充到头部"""
+    response = json.dumps({"selected": ["LineChart"], "reasons": ["trend"]})
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(response))
+    decision = _plan(planner)
+    assert decision is not None
+    assert decision.components == ["ListPanel", "LineChart"]
+
+
+def test_plan_keeps_required_components_when_truncating():
+    """测试 max_components 截断时保留必选组件"""
+    response = json.dumps({"selected": ["LineChart", "ListPanel"], "reasons": ["a", "b"]})
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(response))
+    decision = _plan(planner, max_components=1)
+    assert decision is not None
+    assert decision.components == ["ListPanel"]
+
+
+def test_plan_uses_cache_for_identical_requests():
+    """测试相同输入命中缓存，不重复调用 LLM"""
+    client = FakeLLMClient(json.dumps({"selected": ["ListPanel"], "reasons": ["list"]}))
+    planner = LLMComponentPlanner(llm_client=client)
+    first = _plan(planner)
+    second = _plan(planner)
+    assert first is second
+    assert len(client.prompts) == 1
+
+    _plan(planner, raw_query="另一个问题")
+    assert len(client.prompts) == 2
+
+
+def test_parse_response_handles_markdown_fence():
+    """测试解析 markdown 代码块包裹的 JSON"""
+    raw = 'Sure:\n```json\n{"selected": ["ListPanel"], "reasons": ["ok"]}\n```'
+    assert LLMComponentPlanner._parse_response(raw) == {
+        "selected": ["ListPanel"],
+        "reasons": ["ok"],
+    }
+
+
+def test_parse_response_fast_path_for_bare_json():
+    """测试纯 JSON 响应直接解析，字符串中的反引号不影响结果"""
+    raw = '  {"selected": ["ListPanel"], "reasons": ["use ```code``` block"]}  '
+    assert LLMComponentPlanner._parse_response(raw) == {
+        "selected": ["ListPanel"],
+        "reasons": ["use ```code``` block"],
+    }
+
+
+def test_parse_response_extracts_object_from_prose():
+    """测试从夹杂说明文字的响应中提取 JSON 对象"""
+    raw = 'Here you go: {"selected": ["LineChart"], "reasons": ["trend"]} Thanks!'
+    assert LLMComponentPlanner._parse_response(raw) == {
+        "selected": ["LineChart"],
+        "reasons": ["trend"],
+    }
+
+
+def test_parse_response_stops_at_first_complete_object():
+    """测试对象之后还有花括号文字时仍能提取第一个对象"""
+    raw = 'Result {"selected": ["ListPanel"], "reasons": ["has } brace"]} and {note}'
+    assert LLMComponentPlanner._parse_response(raw) == {
+        "selected": ["ListPanel"],
+        "reasons": ["has } brace"],
+    }
+
+
+def test_parse_response_rejects_invalid_payload():
+    """测试非法响应返回 None"""
+    assert LLMComponentPlanner._parse_response("") is None
+    assert LLMComponentPlanner._parse_response("not json") is None
+    assert LLMComponentPlanner._parse_response('{"selected": "ListPanel", "reasons": []}') is None
+
+
+def test_plan_skips_llm_for_empty_manifest():
+    """测试空 manifest 直接返回 None，不调用 LLM"""
+    client = FakeLLMClient(json.dumps({"selected": ["ListPanel"], "reasons": ["x"]}))
+    planner = LLMComponentPlanner(llm_client=client)
+    decision = planner.plan(
+        route="/test/route",
+        manifest=RouteAdapterManifest(components=[]),
+        context=PlannerContext(),
+        config=ComponentPlannerConfig(),
+    )
+    assert decision is None
+    assert client.prompts == []
+
+
+def test_manifest_lines_cached_per_manifest():
+    """测试 manifest 组件行按实例缓存"""
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(""))
+    first = planner._manifest_lines(MANIFEST)
+    assert [line["component_id"] for line in first] == ["ListPanel", "LineChart", "StatisticCard"]
+    assert planner._manifest_lines(MANIFEST) is first
+
+
+def test_build_prompt_embeds_payload_json():
+    """测试 prompt 中的 JSON 载荷可解析且包含 manifest 与上下文"""
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(""))
+    prompt = planner._build_prompt(
+        "/test/route",
+        MANIFEST,
+        PlannerContext(item_count=3, raw_query="趋势"),
+        ComponentPlannerConfig(max_components=2),
+    )
+    payload = json.loads(prompt[prompt.index("{"):])
+    assert payload["route"] == "/test/route"
+    assert payload["context"]["user_query"] == "趋势"
+    assert payload["constraints"]["max_components"] == 2
+    assert [line["component_id"] for line in payload["manifest"]] == [
+        "ListPanel",
+        "LineChart",
+        "StatisticCard",
+    ]
+
+
+def _aplan(planner, *, raw_query="看看趋势"):
+    return planner.aplan(
+        route="/test/route",
+        manifest=MANIFEST,
+        context=PlannerContext(item_count=10, raw_query=raw_query),
+        config=ComponentPlannerConfig(max_components=3),
+    )
+
+
+def test_aplan_matches_plan_and_uses_cache():
+    """测试异步规划与同步规划结果一致，且共享缓存"""
+    response = json.dumps({"selected": ["LineChart"], "reasons": ["trend"]})
+    client = FakeAsyncLLMClient(response)
+    planner = LLMComponentPlanner(llm_client=client)
+
+    decision = asyncio.run(_aplan(planner))
+    assert decision is not None
+    assert decision.components == ["ListPanel", "LineChart"]
+    assert _plan(planner) is decision
+    assert len(client.prompts) == 1
+
+
+def test_aplan_runs_concurrently_within_limit():
+    """测试多个 aplan 并发执行，并受 max_concurrency 限制"""
+    client = FakeAsyncLLMClient(
+        json.dumps({"selected": ["ListPanel"], "reasons": ["list"]}), delay=0.01
+    )
+    planner = LLMComponentPlanner(llm_client=client, max_concurrency=2)
+
+    async def run_all():
+        return await asyncio.gather(*[_aplan(planner, raw_query=f"q{i}") for i in range(5)])
+
+    decisions = asyncio.run(run_all())
+    assert all(decision is not None for decision in decisions)
+    assert len(client.prompts) == 5
+    assert client.peak == 2
+
+
+def _request(raw_query, manifest=MANIFEST):
+    return PlanRequest(
+        route="/test/route",
+        manifest=manifest,
+        context=PlannerContext(item_count=10, raw_query=raw_query),
+        config=ComponentPlannerConfig(max_components=3),
+    )
+
+
+def test_plan_batch_uses_single_llm_call():
+    """测试多个请求打包为一次 LLM 调用，并按下标拆分结果"""
+    response = json.dumps(
+        {
+            "results": [
+                {"selected": ["LineChart"], "reasons": ["trend"]},
+                {"selected": ["StatisticCard"], "reasons": ["stats"]},
+            ]
+        }
+    )
+    client = SequenceLLMClient([response])
+    planner = LLMComponentPlanner(llm_client=client)
+    empty = RouteAdapterManifest(components=[])
+
+    decisions = planner.plan_batch([_request("a"), _request("skip", empty), _request("b")])
+    assert len(client.prompts) == 1
+    assert json.loads(client.prompts[0][client.prompts[0].index("{"):])["batch"][1]["context"][
+        "user_query"
+    ] == "b"
+    assert decisions[0].components == ["ListPanel", "LineChart"]
+    assert decisions[1] is None
+    assert decisions[2].components == ["ListPanel", "StatisticCard"]
+    # 批量结果同样写入缓存
+    assert _plan(planner, raw_query="a") is decisions[0]
+
+
+def test_plan_batch_falls_back_to_single_plan_for_invalid_items():
+    """测试批量结果中非法的条目回退为单条规划"""
+    batch = json.dumps({"results": [{"selected": ["LineChart"], "reasons": ["trend"]}]})
+    single = json.dumps({"selected": ["StatisticCard"], "reasons": ["stats"]})
+    client = SequenceLLMClient([batch, single])
+    planner = LLMComponentPlanner(llm_client=client)
+
+    decisions = planner.plan_batch([_request("a"), _request("b")])
+    assert len(client.prompts) == 2
+    assert '"batch"' not in client.prompts[1]
+    assert decisions[0].components == ["ListPanel", "LineChart"]
+    assert decisions[1].components == ["ListPanel", "StatisticCard"]
+
+
+def test_plan_batch_respects_batch_size():
+    """测试超过 batch_size 的请求拆分为多次调用"""
+    item = {"selected": ["ListPanel"], "reasons": ["list"]}
+    client = SequenceLLMClient(
+        [json.dumps({"results": [item, item]}), json.dumps({"results": [item, item]})]
+    )
+    planner = LLMComponentPlanner(llm_client=client, batch_size=2)
+    decisions = planner.plan_batch([_request(f"q{i}") for i in range(4)])
+    assert len(client.prompts) == 2
+    assert all(decision.components == ["ListPanel"] for decision in decisions)
+
+
+def test_cache_evicts_least_recently_used():
+    """测试缓存命中会刷新顺序，容量满时淘汰最久未使用的条目"""
+    client = FakeLLMClient(json.dumps({"selected": ["ListPanel"], "reasons": ["list"]}))
+    planner = LLMComponentPlanner(llm_client=client, cache_size=2)
+    _plan(planner, raw_query="a")
+    _plan(planner, raw_query="b")
+    _plan(planner, raw_query="a")  # 命中，a 变为最近使用
+    _plan(planner, raw_query="c")  # 淘汰 b
+    assert len(client.prompts) == 3
+
+    _plan(planner, raw_query="a")
+    assert len(client.prompts) == 3
+    _plan(planner, raw_query="b")
+    assert len(client.prompts) == 4
+
+
+def test_cache_tolerates_concurrent_reads_and_evictions():
+    """测试多线程同时读写小容量缓存时不会因并发淘汰抛出 KeyError"""
+    import threading
+
+    client = FakeLLMClient(json.dumps({"selected": ["ListPanel"], "reasons": ["list"]}))
+    planner = LLMComponentPlanner(llm_client=client, cache_size=2)
+    decision = _plan(planner, raw_query="seed")
+    keys = [("k", i) for i in range(8)]
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(2000):
+                for key in keys:
+                    planner._store_cache(key, decision)
+                    planner._get_cached(key)
+        except Exception as exc:  # pragma: no cover - 失败时记录
+            errors.append(exc)
+
+    import sys
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # 频繁切换线程，放大查找与淘汰之间的竞争窗口
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(planner._cache) <= 2
+
+
+def test_cache_key_is_hashable_tuple_with_cached_fingerprint():
+    """测试缓存键为元组，manifest 指纹按实例缓存"""
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(""))
+    context = PlannerContext(raw_query="q", user_preferences=("a",))
+    config = ComponentPlannerConfig(preferred_components=("LineChart",))
+    key = planner._cache_key("/test/route", MANIFEST, context, config)
+    assert isinstance(key, tuple)
+    hash(key)
+    assert planner._manifest_fingerprint(MANIFEST) is planner._manifest_fingerprint(MANIFEST)
+    assert key == planner._cache_key("/test/route", MANIFEST, context, config)
+    assert key != planner._cache_key("/other", MANIFEST, context, config)
+
+
+def test_parse_response_uses_first_fenced_block():
+    """测试存在多个代码块时解析第一个，且支持无语言标记的代码块"""
+    raw = (
+        "```\n{\"selected\": [\"LineChart\"], \"reasons\": [\"trend\"]}\n```\n"
+        "备选：\n```json\n{\"selected\": [\"ListPanel\"], \"reasons\": [\"list\"]}\n```"
+    )
+    assert LLMComponentPlanner._parse_response(raw) == {
+        "selected": ["LineChart"],
+        "reasons": ["trend"],
+    }
+
+
+def test_build_prompt_splices_cached_manifest_json():
+    """测试拼接缓存的 manifest 片段后，prompt 与整体序列化结果一致"""
+    from services.panel.llm_component_planner import _dump_prompt_json
+
+    planner = LLMComponentPlanner(llm_client=FakeLLMClient(""))
+    context = PlannerContext(item_count=3, raw_query="趋势")
+    config = ComponentPlannerConfig(max_components=2)
+    prompt = planner._build_prompt("/test/route", MANIFEST, context, config)
+
+    payload = json.loads(prompt[prompt.index("{"):])
+    expected = _dump_prompt_json(
+        {"instruction": payload["instruction"], **planner._request_payload("/test/route", MANIFEST, context, config)}
+    )
+    assert prompt.endswith(expected)
+    assert planner._manifest_json(MANIFEST) is planner._manifest_json(MANIFEST)
+
+
+def test_aplan_coalesces_concurrent_identical_requests():
+    """测试相同缓存键的并发 aplan 只调用一次 LLM"""
+    client = FakeAsyncLLMClient(
+        json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}), delay=0.01
+    )
+    planner = LLMComponentPlanner(llm_client=client)
+
+    async def run_all():
+        decisions = await asyncio.gather(*[_aplan(planner) for _ in range(3)])
+        return decisions, dict(planner._loop_state().inflight)
+
+    decisions, inflight = asyncio.run(run_all())
+    assert len(client.prompts) == 1
+    assert decisions[0] is decisions[1] is decisions[2]
+    assert inflight == {}
+
+
+def test_aplan_keeps_per_event_loop_state():
+    """测试不同线程的事件循环各自使用信号量与进行中的调用，互不等待对方的 Future"""
+    import threading
+
+    client = FakeAsyncLLMClient(
+        json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}), delay=0.02
+    )
+    planner = LLMComponentPlanner(llm_client=client, max_concurrency=1)
+    results, errors = [], []
+
+    def worker(raw_query):
+        async def run_all():
+            queries = [raw_query, raw_query, f"{raw_query}-2"]
+            return await asyncio.gather(*[_aplan(planner, raw_query=q) for q in queries])
+
+        try:
+            results.append(asyncio.run(run_all()))
+        except Exception as exc:  # pragma: no cover - 失败时记录
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(q,)) for q in ("loop-a", "loop-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(results) == 2
+    assert all(decision is not None for decisions in results for decision in decisions)
+
+
+def test_plan_coalesces_concurrent_identical_requests_across_threads():
+    """测试多线程下相同缓存键的 plan 只调用一次 LLM"""
+    import threading
+    import time
+
+    class SlowClient(FakeLLMClient):
+        def generate(self, prompt, **kwargs):
+            time.sleep(0.05)
+            return super().generate(prompt, **kwargs)
+
+    client = SlowClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    planner = LLMComponentPlanner(llm_client=client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_plan(planner))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.prompts) == 1
+    assert len(results) == 3
+    assert all(result is results[0] for result in results)
+
+
+def test_plan_waiter_gives_up_when_leader_hangs():
+    """测试领头的 LLM 调用挂起时，等待方超时后返回 None 而不是一起阻塞"""
+    import threading
+
+    release = threading.Event()
+    started = threading.Event()
+
+    class HangingClient(FakeLLMClient):
+        def generate(self, prompt, **kwargs):
+            self.prompts.append(prompt)
+            started.set()
+            release.wait(5)
+            return self.response
+
+    client = HangingClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    planner = LLMComponentPlanner(llm_client=client, inflight_wait_timeout=0.05)
+    leader = threading.Thread(target=lambda: _plan(planner))
+    leader.start()
+    try:
+        assert started.wait(1)
+        assert _plan(planner) is None
+        assert len(client.prompts) == 1
+    finally:
+        release.set()
+        leader.join()
+
+
+class FakeEmbeddingModel:
+    VECTORS = {
+        "最近的趋势": [1.0, 0.0, 0.0],
+        "近期走势如何": [0.96, 0.28, 0.0],
+        "列出全部视频": [0.0, 0.0, 1.0],
+    }
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        return [self.VECTORS[text] for text in texts]
+
+
+def test_semantic_cache_reuses_decision_for_similar_query():
+    """测试语义相近的查询命中语义缓存，不再调用 LLM"""
+    client = FakeLLMClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    embedding = FakeEmbeddingModel()
+    planner = LLMComponentPlanner(llm_client=client, embedding_model=embedding)
+
+    first = _plan(planner, raw_query="最近的趋势")
+    similar = _plan(planner, raw_query="近期走势如何")
+    assert similar is first
+    assert len(client.prompts) == 1
+
+    _plan(planner, raw_query="列出全部视频")
+    assert len(client.prompts) == 2
+    # 每个查询只编码一次
+    assert embedding.calls == 3
+
+
+def test_semantic_cache_requires_matching_config():
+    """测试语义缓存只在除查询外其余条件一致时复用"""
+    client = FakeLLMClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    planner = LLMComponentPlanner(llm_client=client, embedding_model=FakeEmbeddingModel())
+
+    _plan(planner, raw_query="最近的趋势")
+    _plan(planner, raw_query="近期走势如何", max_components=1)
+    assert len(client.prompts) == 2
+
+
+def test_plan_skips_llm_for_deterministic_cases():
+    """测试单组件 manifest 与空数据时直接给出确定决策，不调用 LLM"""
+    client = FakeLLMClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    planner = LLMComponentPlanner(llm_client=client)
+    config = ComponentPlannerConfig()
+
+    single = planner.plan(
+        route="/test/route",
+        manifest=RouteAdapterManifest(components=[ComponentManifestEntry(component_id="Table")]),
+        context=PlannerContext(item_count=10, raw_query="q"),
+        config=config,
+    )
+    assert single.components == ["Table"]
+
+    empty = planner.plan(
+        route="/test/route",
+        manifest=MANIFEST,
+        context=PlannerContext(item_count=0, raw_query="q"),
+        config=config,
+    )
+    assert empty.components == ["ListPanel"]
+    assert empty.reasons[0] == "engine: llm-skipped"
+    assert client.prompts == []
+
+    # 数据不为空时同一查询仍需调用 LLM（空数据决策不写入缓存）
+    _plan(planner, raw_query="q")
+    assert len(client.prompts) == 1
+
+
+def test_plan_defers_to_rules_for_empty_data_without_required_components():
+    """测试空数据且无必选组件时返回 None，交给规则引擎"""
+    client = FakeLLMClient(json.dumps({"selected": ["LineChart"], "reasons": ["trend"]}))
+    planner = LLMComponentPlanner(llm_client=client)
+    manifest = RouteAdapterManifest(
+        components=[
+            ComponentManifestEntry(component_id="LineChart"),
+            ComponentManifestEntry(component_id="Table"),
+        ]
+    )
+    decision = planner.plan(
+        route="/test/route",
+        manifest=manifest,
+        context=PlannerContext(item_count=0),
+        config=ComponentPlannerConfig(),
+    )
+    assert decision is None
+    assert client.prompts == []
+
+
+def test_import_does_not_load_numpy_without_semantic_cache():
+    """测试语义缓存未启用时，导入 planner 不会加载 numpy"""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, services.panel.llm_component_planner; "
+        "sys.exit(1 if 'numpy' in sys.modules else 0)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
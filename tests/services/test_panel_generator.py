@@ -0,0 +1,100 @@
+"""
+测试 PanelGenerator 的组件块构建与调试信息
+"""
+
+from api.schemas.panel import SourceInfo
+from services.panel.panel_generator import PanelBlockInput, PanelGenerator
+
+
+def _block_input(records, *, route="/test/unregistered", requested_components=None):
+    return PanelBlockInput(
+        block_id="block-1",
+        records=records,
+        source_info=SourceInfo(datasource="test", route=route, params={}),
+        title="测试数据",
+        requested_components=requested_components,
+    )
+
+
+def test_generate_uses_fallback_plan_for_unregistered_route():
+    """测试未注册路由使用兜底组件，调试信息只记录最终计划"""
+    generator = PanelGenerator()
+    result = generator.generate(
+        mode="append",
+        block_inputs=[_block_input([{"name": "a", "value": 1}])],
+    )
+
+    assert [block.component for block in result.payload.blocks] == ["FallbackRichText"]
+    assert result.payload.blocks[0].props == {"title_field": "name"}
+    block_debug = result.debug["blocks"][0]
+    assert block_debug["planned_components"] == ["FallbackRichText"]
+    assert block_debug["using_fallback"] is True
+    assert "requested_components" not in block_debug
+
+
+def test_generate_records_requested_components_on_fallback():
+    """测试明确请求组件但适配器无计划时，记录请求的组件"""
+    generator = PanelGenerator()
+    result = generator.generate(
+        mode="append",
+        block_inputs=[_block_input([{"title": "a"}], requested_components=["ListPanel"])],
+    )
+
+    block_debug = result.debug["blocks"][0]
+    assert block_debug["requested_components"] == ["ListPanel"]
+    assert block_debug["fallback_reason"] == (
+        "Adapter returned no block_plans for requested components"
+    )
+    block_id = result.payload.blocks[0].id
+    assert result.component_confidence == {block_id: 0.4}
+
+
+def test_generate_shares_schema_dump_across_child_blocks():
+    """测试同一数据块派生的组件与子组件共享同一份 schema 导出"""
+    from services.panel.adapters import AdapterBlockPlan
+
+    generator = PanelGenerator()
+    plan = AdapterBlockPlan(
+        component_id="Card",
+        props={},
+        children=[
+            AdapterBlockPlan(component_id="StatisticCard", props={}),
+            AdapterBlockPlan(component_id="StatisticCard", props={}),
+        ],
+    )
+    generator._build_fallback_plan = lambda block_input, data_block: plan
+    result = generator.generate(mode="append", block_inputs=[_block_input([{"title": "a"}])])
+
+    card = result.payload.blocks[0]
+    assert [child.component for child in card.children] == ["StatisticCard", "StatisticCard"]
+    assert card.children[0].data["schema"] is card.data["schema"]
+    assert card.children[1].data_ref == card.data_ref == "block-1"
+
+
+def test_data_block_caches_schema_dump():
+    """测试 DataBlock 只导出一次 schema_summary，且不影响序列化"""
+    generator = PanelGenerator()
+    result = generator.generate(mode="append", block_inputs=[_block_input([{"title": "a"}])])
+    data_block = result.data_blocks["block-1"]
+
+    assert data_block.schema_dump() is data_block.schema_dump()
+    assert data_block.schema_dump() == data_block.schema_summary.model_dump()
+    assert result.payload.blocks[0].data["schema"] is data_block.schema_dump()
+    assert "_schema_dump" not in data_block.model_dump()
+
+
+def test_schema_dump_is_not_mutated_by_generation_or_serialization():
+    """测试共享的 schema 导出在生成、序列化面板后仍与 schema_summary 一致（只读约定）"""
+    import copy
+
+    generator = PanelGenerator()
+    result = generator.generate(
+        mode="append", block_inputs=[_block_input([{"title": "a", "score": 1}])]
+    )
+    data_block = result.data_blocks["block-1"]
+    snapshot = copy.deepcopy(data_block.schema_dump())
+
+    result.payload.model_dump()
+    result.payload.model_dump_json()
+
+    assert data_block.schema_dump() == snapshot == data_block.schema_summary.model_dump()
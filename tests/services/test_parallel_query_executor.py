@@ -0,0 +1,306 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+
+if "rag_system" not in sys.modules:
+    rag_system_stub = types.ModuleType("rag_system")
+    rag_system_stub.__path__ = []
+    sys.modules["rag_system"] = rag_system_stub
+
+if "rag_system.rag_pipeline" not in sys.modules:
+    rag_pipeline_stub = types.ModuleType("rag_system.rag_pipeline")
+
+    class _StubRAGPipeline:
+        def search(self, *args, **kwargs):
+            return []
+
+    rag_pipeline_stub.RAGPipeline = _StubRAGPipeline
+    sys.modules["rag_system.rag_pipeline"] = rag_pipeline_stub
+
+import numpy as np
+import pytest
+
+from services.data_query_service import DataQueryResult, QueryDataset
+from services.llm_query_planner import SubQuery
+from services.parallel_query_executor import ParallelQueryExecutor, SemanticQueryCache
+from services.thread_pools import shutdown_pools
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_pools():
+    """每个测试使用全新的共享线程池，池大小不受先前测试影响"""
+    shutdown_pools()
+    yield
+    shutdown_pools()
+
+
+class FakeDataQueryService:
+    """按查询文本返回结果的假数据服务，可模拟耗时与异常。"""
+
+    def __init__(self, delays=None, failures=()):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def query(self, user_query, filter_datasource=None, use_cache=True, prefer_single_route=False, user_id=None):
+        with self._lock:
+            self.calls.append(user_query)
+        time.sleep(self.delays.get(user_query, 0))
+        if user_query in self.failures:
+            raise RuntimeError(f"boom: {user_query}")
+        return DataQueryResult(
+            status="success",
+            items=[{"title": user_query}],
+            datasets=[
+                QueryDataset(
+                    route_id="bilibili/hot-search",
+                    provider="bilibili",
+                    name=user_query,
+                    generated_path="/bilibili/hot-search",
+                    items=[{"title": user_query}],
+                )
+            ],
+        )
+
+
+class FakeEmbeddingModel:
+    """按预设表返回向量的假向量模型。"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts):
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+
+def test_execute_parallel_async_preserves_order_and_errors():
+    """测试异步并行执行：按提交顺序返回，异常与超时转换为错误结果"""
+    service = FakeDataQueryService(delays={"slow": 0.5, "first": 0.05}, failures={"bad"})
+    executor = ParallelQueryExecutor(service, max_workers=4, timeout_per_query=0.2)
+    sub_queries = [SubQuery(query=text) for text in ["first", "bad", "slow", "last"]]
+    try:
+        results = asyncio.run(executor.execute_parallel_async(sub_queries))
+    finally:
+        executor.shutdown()
+
+    assert [r.sub_query.query for r in results] == ["first", "bad", "slow", "last"]
+    assert results[0].result.items == [{"title": "first"}]
+    assert results[1].result is None and "boom" in results[1].error
+    assert results[2].result is None and "超时" in results[2].error
+    assert results[3].error is None
+
+
+def test_execute_parallel_keeps_results_for_duplicate_queries():
+    """测试同步并行执行按提交下标回填结果，重复查询文本不会丢失结果"""
+    service = FakeDataQueryService(delays={"dup": 0.05}, failures={"bad"})
+    executor = ParallelQueryExecutor(service, max_workers=3, timeout_per_query=2)
+    sub_queries = [
+        SubQuery(query="dup", datasource="a"),
+        SubQuery(query="bad"),
+        SubQuery(query="dup", datasource="b"),
+    ]
+    try:
+        results = executor.execute_parallel(sub_queries)
+    finally:
+        executor.shutdown()
+
+    assert [r.sub_query for r in results] == sub_queries
+    assert results[0].sub_query is sub_queries[0]
+    assert results[2].sub_query is sub_queries[2]
+    assert results[1].error and "boom" in results[1].error
+
+
+def test_execute_parallel_dispatches_identical_sub_queries_once():
+    """测试 (query, datasource) 相同的子查询只执行一次，结果回填到每个原始位置"""
+    service = FakeDataQueryService()
+    executor = ParallelQueryExecutor(service, max_workers=3, timeout_per_query=2)
+    sub_queries = [
+        SubQuery(query="dup", datasource="a", reasoning="角度一"),
+        SubQuery(query="other"),
+        SubQuery(query="dup", datasource="a", reasoning="角度二"),
+    ]
+    try:
+        results = executor.execute_parallel(sub_queries)
+        async_results = asyncio.run(executor.execute_parallel_async(sub_queries))
+    finally:
+        executor.shutdown()
+
+    assert sorted(service.calls) == ["dup", "dup", "other", "other"]
+    for batch in (results, async_results):
+        assert [r.sub_query for r in batch] == sub_queries
+        assert batch[2].sub_query is sub_queries[2]
+        assert batch[2].result == batch[0].result
+        assert batch[2].result is not batch[0].result
+        batch[2].result.items.append({"title": "extra"})
+        assert batch[0].result.items == [{"title": "dup"}]
+
+
+EMBEDDINGS = {
+    "B站热搜": [1.0, 0.0],
+    "B站 热搜榜": [0.99, 0.05],
+    "知乎热榜": [0.0, 1.0],
+}
+
+
+def test_semantic_cache_reuses_paraphrased_sub_query():
+    """测试语义缓存：措辞相近的子查询复用结果，不同查询与不同分组不复用"""
+    service = FakeDataQueryService()
+    cache = SemanticQueryCache(FakeEmbeddingModel(EMBEDDINGS))
+    executor = ParallelQueryExecutor(service, max_workers=1, semantic_cache=cache)
+    try:
+        first = executor.execute_parallel([SubQuery(query="B站热搜")])
+        second = executor.execute_parallel([SubQuery(query="B站 热搜榜"), SubQuery(query="知乎热榜")])
+        executor.execute_parallel([SubQuery(query="B站 热搜榜")], use_cache=False)
+        executor.execute_parallel([SubQuery(query="B站 热搜榜")], user_id=7)
+    finally:
+        executor.shutdown()
+
+    assert second[0].result is first[0].result
+    assert service.calls == ["B站热搜", "知乎热榜", "B站 热搜榜", "B站 热搜榜"]
+
+
+def test_semantic_cache_checks_sources_and_invalidates():
+    """测试语义缓存：检索来源重合度不足时不命中，按来源前缀失效"""
+    result = FakeDataQueryService().query("B站热搜")
+    retrieved = {"B站 热搜榜": ["bilibili/hot-search"], "B站热搜": ["zhihu/hot"]}
+    cache = SemanticQueryCache(
+        FakeEmbeddingModel(EMBEDDINGS),
+        source_resolver=lambda query: retrieved[query],
+    )
+    group = (None, False, None)
+    cache.store("B站热搜", group, result)
+
+    assert cache.lookup("B站 热搜榜", group) is result
+    assert cache.lookup("B站热搜", group) is None  # 向量一致但检索来源已变化
+    assert cache.lookup("知乎热榜", group) is None
+
+    assert cache.invalidate("/zhihu") == 0
+    assert cache.invalidate("bilibili") == 1
+    assert cache.lookup("B站 热搜榜", group) is None
+
+
+def test_default_max_workers_scales_with_cpu_and_env(monkeypatch):
+    """测试默认并行度按 CPU 核数推算，并可由环境变量覆盖"""
+    import services.parallel_query_executor as module
+
+    monkeypatch.delenv(module.PARALLEL_WORKERS_ENV, raising=False)
+    monkeypatch.setattr(module.os, "cpu_count", lambda: 1)
+    assert module.default_max_workers() == 4
+    monkeypatch.setattr(module.os, "cpu_count", lambda: 64)
+    assert module.default_max_workers() == 32
+
+    monkeypatch.setenv(module.PARALLEL_WORKERS_ENV, "6")
+    executor = ParallelQueryExecutor(FakeDataQueryService())
+    try:
+        assert executor.max_workers == 6
+    finally:
+        executor.shutdown()
+
+    monkeypatch.setenv(module.PARALLEL_WORKERS_ENV, "many")
+    assert module.default_max_workers() == 32
+
+
+def test_executors_share_process_pool_and_keep_it_alive():
+    """测试多个执行器绑定同一共享线程池，单个实例关闭不影响其他实例"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    first = ParallelQueryExecutor(FakeDataQueryService())
+    second = ParallelQueryExecutor(FakeDataQueryService())
+    assert first.executor is second.executor
+
+    first.shutdown()
+    results = second.execute_parallel([SubQuery(query="after-shutdown")])
+    assert results[0].error is None
+
+    with ThreadPoolExecutor(max_workers=1) as own_pool:
+        injected = ParallelQueryExecutor(FakeDataQueryService(), executor=own_pool)
+        assert injected.executor is own_pool
+
+
+def test_executor_parallelism_follows_actual_shared_pool_size(caplog):
+    """测试共享池已按其他大小创建时，并行度取池的实际大小并记录警告"""
+    first = ParallelQueryExecutor(FakeDataQueryService(), max_workers=2)
+    with caplog.at_level("WARNING", logger="services.thread_pools"):
+        second = ParallelQueryExecutor(FakeDataQueryService(), max_workers=8)
+
+    assert second.executor is first.executor
+    assert second.max_workers == 2
+    assert "忽略请求的 max_workers=8" in caplog.text
+
+
+def test_execute_parallel_pre_embeds_sub_queries_in_one_batch():
+    """测试派发前一次性批量向量化子查询，并将向量逐条传给数据服务"""
+
+    class EmbeddingDataQueryService(FakeDataQueryService):
+        def __init__(self):
+            super().__init__()
+            self.embed_calls = []
+            self.received = {}
+
+        def embed_queries(self, queries):
+            self.embed_calls.append(list(queries))
+            return np.array([[float(index)] for index in range(len(queries))])
+
+        def query(self, user_query, query_embedding=None, **kwargs):
+            self.received[user_query] = query_embedding
+            return super().query(user_query, **kwargs)
+
+    service = EmbeddingDataQueryService()
+    executor = ParallelQueryExecutor(service, max_workers=2)
+    results = executor.execute_parallel([SubQuery(query="a"), SubQuery(query="b")])
+    async_results = asyncio.run(
+        executor.execute_parallel_async([SubQuery(query="c"), SubQuery(query="d")])
+    )
+
+    assert all(r.error is None for r in results + async_results)
+    assert service.embed_calls == [["a", "b"], ["c", "d"]]
+    assert {query: float(vector[0]) for query, vector in service.received.items()} == {
+        "a": 0.0, "b": 1.0, "c": 0.0, "d": 1.0,
+    }
+
+
+def test_execute_parallel_marks_overdue_sub_queries_as_timeouts():
+    """测试同步并行执行超过统一截止时间后，未完成的子查询记为超时而不是抛出异常"""
+    service = FakeDataQueryService(delays={"slow": 0.6})
+    executor = ParallelQueryExecutor(service, max_workers=2, timeout_per_query=0.2)
+    started = time.monotonic()
+    results = executor.execute_parallel([SubQuery(query="fast"), SubQuery(query="slow")])
+
+    assert time.monotonic() - started < 0.5
+    assert results[0].error is None
+    assert results[1].result is None and "超时" in results[1].error
+
+
+def test_pre_embed_skips_sub_queries_with_cached_rag_results():
+    """测试 RAG 缓存命中的子查询不参与批量向量化；关闭缓存时全部编码"""
+
+    class CachedEmbeddingService(FakeDataQueryService):
+        def __init__(self, cached):
+            super().__init__()
+            self.cached = set(cached)
+            self.embed_calls = []
+
+        def is_rag_cached(self, user_query, filter_datasource=None):
+            return user_query in self.cached
+
+        def embed_queries(self, queries):
+            self.embed_calls.append(list(queries))
+            return np.array([[float(index)] for index in range(len(queries))])
+
+    service = CachedEmbeddingService(cached={"a"})
+    executor = ParallelQueryExecutor(service, max_workers=2)
+    sub_queries = [SubQuery(query=text) for text in ["a", "b", "c"]]
+
+    embeddings = executor._pre_embed(sub_queries)
+    assert service.embed_calls == [["b", "c"]]
+    assert embeddings[0] is None
+    assert [float(vector[0]) for vector in embeddings[1:]] == [0.0, 1.0]
+
+    executor._pre_embed(sub_queries[:2])
+    assert service.embed_calls == [["b", "c"]]  # 只剩一个未命中，交给 RAG 自行编码
+
+    executor._pre_embed(sub_queries, use_cache=False)
+    assert service.embed_calls[-1] == ["a", "b", "c"]
@@ -109,6 +109,17 @@ def test_research_config_callback_invalid_raises():
         ResearchConfig(user_query="test", callback=123)
 
 
+def test_research_config_callback_flush_ms_invalid_raises():
+    """测试回调合并窗口超出范围抛出异常"""
+    assert ResearchConfig(user_query="test").callback_flush_ms == 0
+
+    with pytest.raises(ValueError, match="callback_flush_ms 必须在 0-1000 之间"):
+        ResearchConfig(user_query="test", callback_flush_ms=-1)
+
+    with pytest.raises(ValueError, match="callback_flush_ms 必须在 0-1000 之间"):
+        ResearchConfig(user_query="test", callback_flush_ms=1001)
+
+
 def test_research_config_from_dict():
     """测试从字典创建配置对象"""
     data = {
@@ -149,3 +160,13 @@ def test_research_config_edge_cases():
     long_task_id = "x" * 128
     config4 = ResearchConfig(user_query="test", task_id=long_task_id)
     assert len(config4.task_id) == 128
+
+
+def test_research_config_is_immutable():
+    """测试配置对象创建后不可修改（frozen + slots）"""
+    from dataclasses import FrozenInstanceError
+
+    config = ResearchConfig(user_query="test")
+    with pytest.raises(FrozenInstanceError):
+        config.max_steps = 200
+    assert not hasattr(config, "__dict__")
@@ -0,0 +1,107 @@
+import sys
+import threading
+import time
+import types
+
+# Stub for rag_system
+if "rag_system" not in sys.modules:
+    rag_system_stub = types.ModuleType("rag_system")
+    rag_system_stub.__path__ = []
+    sys.modules["rag_system"] = rag_system_stub
+
+if "rag_system.rag_pipeline" not in sys.modules:
+    rag_pipeline_stub = types.ModuleType("rag_system.rag_pipeline")
+
+    class _StubRAGPipeline:
+        def search(self, *args, **kwargs):
+            return []
+
+    rag_pipeline_stub.RAGPipeline = _StubRAGPipeline
+    sys.modules["rag_system.rag_pipeline"] = rag_pipeline_stub
+
+from services.research_service import _CallbackBatcher
+
+
+def test_callback_batcher_delivers_on_calling_thread_after_window():
+    """窗口内的步骤合并，窗口过后的下一次 add 在调用线程上投递，不启动额外线程"""
+    delivered = []
+    threads = []
+
+    def callback(payload):
+        delivered.append(payload)
+        threads.append(threading.get_ident())
+
+    thread_count = threading.active_count()
+    batcher = _CallbackBatcher(callback, flush_ms=20)
+    batcher.add({"step": 1})
+    assert delivered == []
+    assert threading.active_count() == thread_count
+
+    time.sleep(0.03)
+    batcher.add({"step": 2})
+
+    assert delivered == [{"type": "step_batch", "events": [{"step": 1}, {"step": 2}]}]
+    assert threads == [threading.get_ident()]
+
+
+def test_callback_batcher_flushes_when_batch_is_full():
+    """缓冲满 max_batch 条时立即投递，结束时 flush 投递剩余步骤"""
+    delivered = []
+    batcher = _CallbackBatcher(delivered.append, flush_ms=1000, max_batch=2)
+
+    batcher.add({"step": 1})
+    batcher.add({"step": 2})
+    batcher.add({"step": 3})
+    assert delivered == [{"type": "step_batch", "events": [{"step": 1}, {"step": 2}]}]
+
+    batcher.flush()
+    batcher.flush()
+    assert delivered[1:] == [{"type": "step_batch", "events": [{"step": 3}]}]
+
+
+class _StubApp:
+    """按给定事件数产出图事件的 LangGraph 应用桩"""
+
+    def __init__(self, event_count):
+        self.event_count = event_count
+        self.pulled = 0
+
+    def stream(self, state, config):
+        for _ in range(self.event_count):
+            self.pulled += 1
+            yield {"router": {"router_decision": "complex_research"}}
+
+    def get_state(self, config):
+        return types.SimpleNamespace(values={"final_report": "done"})
+
+
+def _make_service(app):
+    from services.research_service import ResearchService
+    from services.research_task_hub import ResearchTaskHub
+
+    service = ResearchService.__new__(ResearchService)
+    service.app = app
+    service.runtime = types.SimpleNamespace(tool_context=types.SimpleNamespace(extras={}))
+    service.task_hub = ResearchTaskHub()
+    service.data_store = types.SimpleNamespace(stats=lambda: {})
+    return service
+
+
+def test_research_warns_only_when_steps_are_truncated(caplog):
+    """恰好在 max_steps 步自然结束时不告警，超出 max_steps 时才告警"""
+    from services.research_constants import ResearchConfig
+
+    finished = _make_service(_StubApp(3))
+    with caplog.at_level("WARNING", logger="services.research_service"):
+        result = finished.research_with_config(ResearchConfig(user_query="q", max_steps=3))
+    assert result.success
+    assert len(result.execution_steps) == 3
+    assert "达到最大步数" not in caplog.text
+
+    app = _StubApp(10)
+    truncated = _make_service(app)
+    with caplog.at_level("WARNING", logger="services.research_service"):
+        result = truncated.research_with_config(ResearchConfig(user_query="q", max_steps=3))
+    assert len(result.execution_steps) == 3
+    assert app.pulled == 4
+    assert "达到最大步数 3" in caplog.text
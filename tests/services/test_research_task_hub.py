@@ -37,3 +37,90 @@ def test_task_hub_store_last_state():
     hub.set_last_state("task-3", {"final_report": "ok"})
     context = hub.get_task("task-3")
     assert context and context.last_state == {"final_report": "ok"}
+
+
+def test_task_hub_unregister_listener_stops_delivery():
+    hub = ResearchTaskHub()
+    hub.ensure_task("task-4", "thread-4", "query", None)
+    first = hub.register_listener("task-4")
+    second = hub.register_listener("task-4")
+
+    hub.unregister_listener("task-4", first)
+    hub.publish_event("task-4", {"type": "step"})
+
+    assert hub.get_task("task-4").listeners == (second,)
+    assert first.empty()
+    assert second.get_nowait() == {"type": "step"}
+
+
+def test_task_hub_history_keeps_latest_events():
+    hub = ResearchTaskHub(history_limit=3)
+    hub.ensure_task("task-5", "thread-5", "query", None)
+    for step in range(5):
+        hub.publish_event("task-5", {"type": "step", "step": step})
+
+    queue = hub.register_listener("task-5")
+    replayed = [queue.get_nowait()["step"] for _ in range(queue.qsize())]
+
+    assert replayed == [2, 3, 4]
+
+
+def test_task_hub_batches_events_within_window():
+    hub = ResearchTaskHub(batch_window_ms=50)
+    hub.ensure_task("task-6", "thread-6", "query", None)
+    queue = hub.register_listener("task-6")
+
+    hub.publish_event("task-6", {"type": "step", "step": 1})
+    hub.publish_event("task-6", {"type": "step", "step": 2})
+    batch = queue.get(timeout=1)
+
+    assert batch["type"] == "batch"
+    assert [event["step"] for event in batch["events"]] == [1, 2]
+    assert len(hub.get_task("task-6").history) == 2
+
+
+def test_task_hub_flushes_batch_on_terminal_event():
+    hub = ResearchTaskHub(batch_window_ms=10_000)
+    hub.ensure_task("task-7", "thread-7", "query", None)
+    queue = hub.register_listener("task-7")
+
+    hub.publish_event("task-7", {"type": "step", "step": 1})
+    assert queue.empty()
+
+    hub.cancel_task("task-7", reason="test")
+    batch = queue.get_nowait()
+
+    assert [event["type"] for event in batch["events"]] == ["step", "cancelled"]
+    assert hub.get_task("task-7").flush_timer is None
+
+
+def test_task_hub_late_listener_gets_batched_events_once():
+    hub = ResearchTaskHub(batch_window_ms=10_000)
+    hub.ensure_task("task-8", "thread-8", "query", None)
+
+    hub.publish_event("task-8", {"type": "step", "step": 1})
+    assert hub.get_task("task-8").flush_timer is None
+
+    first = hub.register_listener("task-8")
+    hub.publish_event("task-8", {"type": "step", "step": 2})
+    second = hub.register_listener("task-8")
+
+    assert [first.get_nowait()["step"] for _ in range(first.qsize())] == [1, 2]
+    assert [second.get_nowait()["step"] for _ in range(second.qsize())] == [1, 2]
+
+
+def test_task_hub_wait_for_task_without_placeholder():
+    hub = ResearchTaskHub()
+
+    assert hub.wait_for_task("missing", timeout=0.01) is False
+    assert hub.has_task("missing") is False
+
+    timer = threading.Timer(0.05, hub.ensure_task, args=("task-9", "thread-9", "query", None))
+    timer.start()
+    try:
+        assert hub.wait_for_task("task-9", timeout=2) is True
+    finally:
+        timer.join()
+
+    assert hub.get_task("task-9").thread_id == "thread-9"
+    assert hub._pending_waiters == {}
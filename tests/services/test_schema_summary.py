@@ -0,0 +1,145 @@
+from datetime import datetime
+
+from services.panel.schema_summary import SchemaSummaryBuilder
+
+
+RECORDS = [
+    {"title": "a", "score": 1, "published": "2024-01-01T00:00:00Z", "tags": ["x"], "_raw": {}},
+    {"title": "b", "score": 3.5, "published": "2024-01-03T00:00:00+00:00", "tags": ["x", "y"]},
+    {"title": "c", "score": None, "published": "2024-01-02T00:00:00Z", "tags": []},
+]
+
+
+def test_build_infers_field_types_and_stats():
+    """测试字段类型推断与基础统计"""
+    summary = SchemaSummaryBuilder().build(RECORDS)
+    fields = {field.name: field for field in summary.fields}
+
+    assert [field.name for field in summary.fields] == ["published", "score", "tags", "title"]
+    assert "_raw" not in fields
+    assert fields["title"].type == "string"
+    assert fields["score"].type == "number"
+    assert fields["score"].stats == {"min": 1.0, "max": 3.5, "avg": 2.25, "median": 2.25, "std": 1.25}
+    assert fields["tags"].type == "array"
+    assert fields["tags"].stats == {"avg_length": 1}
+    assert summary.stats["total"] == 3
+    assert summary.schema_digest == "List(published:string/score:number/tags:array/title:string)"
+
+
+def test_number_stats_match_statistics_module():
+    """测试数值统计与 statistics 模块结果一致"""
+    import math
+    import statistics
+
+    values = [0.1 * i + (i % 7) * 3.3 for i in range(1, 200)]
+    stats = SchemaSummaryBuilder()._number_stats(values + [None])
+    assert stats["min"] == min(values)
+    assert stats["max"] == max(values)
+    assert stats["median"] == statistics.median(values)
+    assert math.isclose(stats["avg"], statistics.mean(values), rel_tol=1e-12)
+    assert math.isclose(stats["std"], statistics.pstdev(values), rel_tol=1e-12)
+    assert "std" not in SchemaSummaryBuilder()._number_stats([5])
+
+
+def test_build_datetime_fields_produce_time_range():
+    """测试 datetime 字段生成时间范围"""
+    records = [
+        {"ts": datetime(2024, 1, 2)},
+        {"ts": datetime(2024, 1, 1)},
+    ]
+    summary = SchemaSummaryBuilder().build(records)
+    assert summary.fields[0].type == "datetime"
+    assert summary.fields[0].stats["count"] == 2
+    assert summary.stats["time_range"] == ["2024-01-01T00:00:00", "2024-01-02T00:00:00"]
+
+
+def test_time_range_merges_extremes_across_datetime_fields():
+    """测试多个 datetime 字段的时间范围取各字段极值的并集"""
+    records = [
+        {"created": datetime(2024, 3, 1), "updated": datetime(2024, 5, 1)},
+        {"created": datetime(2024, 1, 1), "updated": datetime(2024, 2, 1)},
+    ]
+    summary = SchemaSummaryBuilder().build(records)
+    assert summary.stats["time_range"] == ["2024-01-01T00:00:00", "2024-05-01T00:00:00"]
+
+
+def test_build_empty_records():
+    """测试空记录返回 Empty 摘要"""
+    summary = SchemaSummaryBuilder().build([])
+    assert summary.fields == []
+    assert summary.stats == {"total": 0}
+    assert summary.schema_digest == "Empty"
+
+
+def test_samples_keep_head_and_tail():
+    """测试样本保留前几个与最后一个非空值"""
+    records = [{"n": i} for i in range(10)]
+    summary = SchemaSummaryBuilder(max_samples=4).build(records)
+    assert summary.fields[0].sample == [0, 1, 2, 9]
+
+
+def test_accumulator_matches_build():
+    """测试增量累加器与 build 结果一致"""
+    builder = SchemaSummaryBuilder()
+    accumulator = builder.accumulator()
+    for record in RECORDS:
+        accumulator.observe(record)
+    assert accumulator.finalize() == builder.build(RECORDS)
+
+
+def test_single_type_handles_builtin_and_subclass_values():
+    """测试精确类型查表与子类回退结果一致"""
+    from collections import OrderedDict
+
+    single_type = SchemaSummaryBuilder._single_type
+    assert single_type(None) == "null"
+    assert single_type(True) == "boolean"
+    assert single_type(3) == "number"
+    assert single_type(2.5) == "number"
+    assert single_type("x") == "string"
+    assert single_type([1]) == "array"
+    assert single_type({"a": 1}) == "object"
+    assert single_type(OrderedDict(a=1)) == "object"
+    assert single_type(datetime(2024, 1, 1)) == "datetime"
+    assert single_type(object()) == "string"
+
+
+def test_parse_datetime_skips_non_iso_strings():
+    """测试非 ISO 字符串被跳过，ISO 字符串（含 Z 后缀）正常解析"""
+    parsed = SchemaSummaryBuilder._parse_datetime(
+        ["hello", "2024-01-01T00:00:00Z", "2024-01-02", "2024-13-01", None, datetime(2024, 1, 3)]
+    )
+    assert [value.date().isoformat() for value in parsed] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+
+def test_datetime_fields_are_parsed_once(monkeypatch):
+    """测试 datetime 字段在生成摘要时只解析一次"""
+    calls = []
+    original = SchemaSummaryBuilder._parse_datetime
+
+    def counting(values):
+        calls.append(values)
+        return original(values)
+
+    monkeypatch.setattr(SchemaSummaryBuilder, "_parse_datetime", staticmethod(counting))
+    summary = SchemaSummaryBuilder().build([{"ts": datetime(2024, 1, 2)}, {"ts": datetime(2024, 1, 1)}])
+    assert len(calls) == 1
+    assert summary.fields[0].stats == {
+        "min": "2024-01-01T00:00:00",
+        "max": "2024-01-02T00:00:00",
+        "count": 2,
+    }
+
+
+def test_infer_type_merges_compatible_types():
+    """测试类型推断：number/null 合并为 number，字符串类合并为 string，其余为 mixed"""
+    infer = SchemaSummaryBuilder._infer_type
+    assert infer([]) == "unknown"
+    assert infer([None, None]) == "null"
+    assert infer([1, None, 2.5]) == "number"
+    assert infer(["a", None, datetime(2024, 1, 1)]) == "string"
+    assert infer([datetime(2024, 1, 1), None]) == "string"
+    assert infer([1, "a"]) == "mixed"
+    assert infer([None, 1, datetime(2024, 1, 1)]) == "mixed"
+    assert infer([True, 1]) == "mixed"
+    assert infer([[1], [2]]) == "array"